@@ -0,0 +1,17 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python package contains the benchmark suite of our application, which times and
+measures the peak memory of loading job postings, building our data structures and
+querying them, on synthetic jobs.csv files of any size.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
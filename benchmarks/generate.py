@@ -0,0 +1,114 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the synthetic job posting generator of our benchmark
+suite, which writes a seeded jobs.csv file with the same columns as our scraper.
+
+Usage: python -m benchmarks.generate <number of jobs> <output file> [--seed SEED]
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+import argparse
+import csv
+import random
+from src.utility import clear_csv
+
+# The cities job postings are located in, as (city, country, latitude, longitude)
+CITIES = [
+    ("Toronto", "Canada", 43.65, -79.38),
+    ("Waterloo", "Canada", 43.46, -80.52),
+    ("Ottawa", "Canada", 45.42, -75.70),
+    ("Montreal", "Canada", 45.50, -73.57),
+    ("Vancouver", "Canada", 49.28, -123.12),
+    ("Calgary", "Canada", 51.05, -114.07),
+    ("New York", "United States", 40.71, -74.01),
+    ("Boston", "United States", 42.36, -71.06),
+    ("Chicago", "United States", 41.88, -87.63),
+    ("Austin", "United States", 30.27, -97.74),
+    ("Seattle", "United States", 47.61, -122.33),
+    ("San Francisco", "United States", 37.77, -122.42),
+    ("Los Angeles", "United States", 34.05, -118.24),
+    ("Atlanta", "United States", 33.75, -84.39),
+]
+
+SKILLS = [
+    "Python", "Java", "C++", "C", "JavaScript", "TypeScript", "React", "SQL", "Go", "Rust",
+    "AWS", "Docker", "Kubernetes", "Linux", "Git", "Machine Learning", "Node.js", "HTML", "CSS",
+]
+
+TITLES = [
+    "Software Engineering Intern", "Software Developer Intern", "Frontend Developer Intern",
+    "Backend Engineer Intern", "Full Stack Developer Intern", "Data Engineering Intern",
+    "Machine Learning Intern", "Mobile Developer Intern", "Site Reliability Intern",
+]
+
+# The words descriptions are made of, including every keyword which Job checks for
+WORDS = [
+    "remote", "hybrid", "frontend", "front-end", "backend", "fullstack", "full-stack", "full stack",
+    "python", "java", "c++", "team", "build", "services", "product", "users", "design", "testing",
+    "cloud", "data", "platform", "scalable", "collaborate", "learn", "ship", "features", "code",
+]
+
+# The range of pay for each pay period
+PAY_RANGES = {"ANNUAL": (40000, 140000), "MONTHLY": (3000, 11000), "HOURLY": (18, 65)}
+
+
+def generate_jobs_csv(file: str, num_jobs: int, seed: int = 0) -> None:
+    """
+    Writes <num_jobs> random job postings to <file>, with the header written by
+    src.utility.clear_csv. The same <seed> always generates the same file.
+
+    Preconditions:
+    - num_jobs >= 0
+    """
+    rng = random.Random(seed)
+    clear_csv(file)
+    with open(file, "a", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        for i in range(num_jobs):
+            writer.writerow(_random_job(rng, i))
+
+
+def _random_job(rng: random.Random, i: int) -> list:
+    """
+    Returns the row of the <i>-th random job posting, in the column order of clear_csv.
+    """
+    city, country, lat, lng = rng.choice(CITIES)
+    pay_period = rng.choice(list(PAY_RANGES))
+    low, high = PAY_RANGES[pay_period]
+    job_id = str(1000000000 + i)
+    fragment = " ".join(rng.choices(WORDS, k=12))
+    return [
+        rng.choice(TITLES),
+        f"Employer {rng.randrange(max(i // 20, 1) + 1)}",
+        round(rng.uniform(1.0, 5.0), 1),
+        f"https://www.glassdoor.ca/job-listing/{job_id}",
+        f"<ul><li>{fragment}</li></ul>",
+        str(rng.sample(SKILLS, rng.randint(0, 6))),
+        lat + rng.uniform(-0.5, 0.5),
+        lng + rng.uniform(-0.5, 0.5),
+        city,
+        country,
+        pay_period,
+        rng.randint(low, high),
+        job_id,
+        " ".join(rng.choices(WORDS, k=80)),
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic jobs.csv file.")
+    parser.add_argument("num_jobs", type=int, help="the number of job postings to write")
+    parser.add_argument("file", help="the csv file to write")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random job postings")
+    args = parser.parse_args()
+    generate_jobs_csv(args.file, args.num_jobs, args.seed)
@@ -0,0 +1,306 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the benchmark runner of our benchmark suite, which times
+and measures the peak memory of each hot path on synthetic jobs.csv files of the given
+sizes, writes the results as JSON, and compares them against a saved baseline.
+
+Usage: python -m benchmarks.run [--sizes N ...] [--output FILE] [--baseline FILE] ...
+(see python -m benchmarks.run --help)
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from typing import Any, Callable, Optional
+from pathlib import Path
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from benchmarks.generate import generate_jobs_csv
+from src.structures import BitmaskDecisionTree, DecisionTree, WeightedGraph, load_graph_and_tree
+from src.utility import load_jobs_csv, similarity_calculation
+from src.lsh import benchmark_recall
+
+# Bump this whenever the layout of the results changes
+RESULTS_VERSION = 1
+
+# Every stage which can be benchmarked, in the order they are run
+STAGES = (
+    "load_jobs_csv", "load_graph_and_tree", "get_jobs", "build_answer_table", "get_top_jobs",
+    "get_similar_jobs", "similarity_calculation", "lsh_recall",
+)
+
+
+def measure(func: Callable[[], Any], repeat: int = 1, memory: bool = True) -> tuple[dict[str, Any], Any]:
+    """
+    Returns a tuple (measurement, result), where <result> is the value returned by <func>
+    and <measurement> holds the fastest of <repeat> timed calls to <func>, in seconds,
+    and the peak memory allocated during one more call, in bytes (None if not <memory>).
+
+    Memory is traced in its own call, since tracing slows down the traced code.
+
+    Preconditions:
+    - repeat > 0
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": peak}, result
+
+
+def measure_job_memory(file: str) -> float:
+    """
+    Returns the memory retained by the jobs loaded from <file> by load_jobs_csv, in bytes
+    per job: everything allocated while loading them which is still allocated afterwards.
+
+    Preconditions:
+    - <file> has at least one job
+    """
+    tracemalloc.start()
+    try:
+        jobs = load_jobs_csv(file)
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return retained / len(jobs)
+
+
+def run_size(file: str, size: int, options: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Returns the benchmark results of every stage in options["stages"] on the jobs in <file>,
+    of which there are <size>.
+
+    <options> maps "stages", "top_k", "queries", "repeat", "memory", "seed", "lsh_bands"
+    and "recall_queries" to the command line options of the same names described in main.
+
+    The lsh_recall stage records one result per number of bands in options["lsh_bands"],
+    whose time per call is that of one MinHashIndex query, along with the index's recall
+    of the graph's top 15 neighbours (see src.lsh.benchmark_recall).
+    """
+    stages, repeat, memory = options["stages"], options["repeat"], options["memory"]
+    rng = random.Random(options["seed"])
+    results = []
+
+    def record(stage: str, func: Callable[[], Any], calls: int = 1) -> Any:
+        measurement, result = measure(func, repeat, memory)
+        results.append({
+            "stage": stage,
+            "size": size,
+            "calls": calls,
+            "seconds": measurement["seconds"],
+            "seconds_per_call": measurement["seconds"] / calls,
+            "peak_bytes": measurement["peak_bytes"],
+        })
+        return result
+
+    if "load_jobs_csv" in stages:
+        jobs = record("load_jobs_csv", lambda: load_jobs_csv(file))
+        if memory and jobs:
+            results[-1]["bytes_per_job"] = measure_job_memory(file)
+    else:
+        jobs = load_jobs_csv(file)
+
+    def build() -> tuple[WeightedGraph, DecisionTree]:
+        return load_graph_and_tree(top_k=options["top_k"], cache_dir=None, file=file)
+
+    graph = tree = None
+    if {"load_graph_and_tree", "get_similar_jobs", "lsh_recall"} & set(stages):
+        graph, tree = record("load_graph_and_tree", build) if "load_graph_and_tree" in stages else build()
+
+    if tree is None and {"get_jobs", "build_answer_table", "get_top_jobs"} & set(stages):
+        tree = BitmaskDecisionTree()
+        for job in jobs:
+            tree.insert(job)
+    preferences = [[rng.randint(0, 1) for _ in range(7)] for _ in range(options["queries"])]
+
+    if "get_jobs" in stages:
+        record("get_jobs", lambda: [tree.get_jobs(list(p)) for p in preferences], len(preferences))
+
+    if "build_answer_table" in stages:
+        record("build_answer_table", tree.build_answer_table)
+        results[-1]["table_bytes"] = tree.answers.nbytes
+
+    if "get_top_jobs" in stages:
+        record("get_top_jobs", lambda: [tree.get_top_jobs(p) for p in preferences], len(preferences))
+
+    if "get_similar_jobs" in stages and len(jobs) >= 15:
+        registered = list(tree.registry)
+        queries = [rng.choice(registered) for _ in range(options["queries"])]
+        record("get_similar_jobs", lambda: [graph.get_similar_jobs(job) for job in queries], len(queries))
+
+    if "similarity_calculation" in stages and len(jobs) >= 2:
+        pairs = [rng.sample(jobs, 2) for _ in range(options["queries"])]
+        record("similarity_calculation", lambda: [similarity_calculation(a, b) for a, b in pairs], len(pairs))
+
+    if "lsh_recall" in stages and len(jobs) >= 16:
+        k = 15 if options["top_k"] is None else min(15, options["top_k"])
+        for recall in benchmark_recall(graph, options["lsh_bands"], num_queries=options["recall_queries"], k=k,
+                                       seed=options["seed"]):
+            calls = min(options["recall_queries"], len(graph))
+            results.append({
+                "stage": f"lsh_recall_{recall['num_bands']}",
+                "size": size,
+                "calls": calls,
+                "seconds": recall["query_time"] * calls,
+                "seconds_per_call": recall["query_time"],
+                "peak_bytes": None,
+                "recall": recall["recall"],
+                "avg_candidates": recall["avg_candidates"],
+            })
+
+    return results
+
+
+def run_benchmarks(sizes: list[int], data_dir: str, options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Returns the benchmark results of every stage in options["stages"] on a synthetic
+    jobs.csv of each size in <sizes>, generated in <data_dir> with options["seed"] unless
+    it already exists, along with a description of the environment they were run in.
+    """
+    results = []
+    for size in sizes:
+        file = Path(data_dir) / f"jobs_{size}_{options['seed']}.csv"
+        if not file.is_file():
+            generate_jobs_csv(str(file), size, options["seed"])
+        results.extend(run_size(str(file), size, options))
+
+    return {
+        "version": RESULTS_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "options": {name: value for name, value in options.items() if name != "stages"},
+        "results": results,
+    }
+
+
+def compare_results(
+    current: dict[str, Any], baseline: dict[str, Any], tolerance: float = 0.25
+) -> list[str]:
+    """
+    Returns a description of every regression of <current> against <baseline>: every
+    stage and size benchmarked in both whose time per call, peak memory or memory per
+    job grew by more than a fraction <tolerance> of its baseline, or whose recall fell
+    by more than that fraction.
+
+    Preconditions:
+    - tolerance >= 0
+    """
+    expected = {(result["stage"], result["size"]): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = expected.get((result["stage"], result["size"]))
+        if before is None:
+            continue
+        for metric in ("seconds_per_call", "peak_bytes", "bytes_per_job"):
+            old, new = before.get(metric), result.get(metric)
+            if old is not None and new is not None and new > old * (1 + tolerance):
+                growth = f" ({new / old - 1:+.0%})" if old > 0 else ""
+                regressions.append(
+                    f"{result['stage']} ({result['size']} jobs): {metric} rose from {old:.6g} to {new:.6g}{growth}"
+                )
+        old, new = before.get("recall"), result.get("recall")
+        if old is not None and new is not None and new < old * (1 - tolerance):
+            regressions.append(f"{result['stage']} ({result['size']} jobs): recall fell from {old:.3f} to {new:.3f}")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Runs the benchmarks described by the command line arguments <argv> (sys.argv if
+    <argv> is None), and returns the exit status: 1 if there were regressions against
+    the baseline, and 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the CareerCompass hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="the numbers of jobs to benchmark, e.g. 1000 10000 100000 1000000")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES),
+                        help="the stages to benchmark (default: every stage)")
+    parser.add_argument("--top-k", type=int, default=20,
+                        help="the number of neighbours each job keeps in the graph (0 for a complete graph)")
+    parser.add_argument("--queries", type=int, default=1000, help="the number of calls of each query stage")
+    parser.add_argument("--lsh-bands", type=int, nargs="+", default=[4, 8, 16, 32],
+                        help="the numbers of MinHash bands whose recall the lsh_recall stage measures")
+    parser.add_argument("--recall-queries", type=int, default=200,
+                        help="the number of query jobs the recall of each number of bands is averaged over")
+    parser.add_argument("--repeat", type=int, default=3, help="the number of timed runs of each stage")
+    parser.add_argument("--no-memory", action="store_true", help="skip measuring peak memory")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the synthetic jobs and queries")
+    parser.add_argument("--data-dir", help="where to keep the synthetic jobs.csv files (default: a temporary folder)")
+    parser.add_argument("--output", help="the JSON file to write the results to")
+    parser.add_argument("--baseline", help="a JSON file of earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="the fraction a metric may grow by before it is a regression")
+    args = parser.parse_args(argv)
+
+    options = {
+        "stages": args.stages,
+        "top_k": args.top_k or None,
+        "queries": args.queries,
+        "repeat": args.repeat,
+        "memory": not args.no_memory,
+        "seed": args.seed,
+        "lsh_bands": args.lsh_bands,
+        "recall_queries": args.recall_queries,
+    }
+    if args.data_dir is None:
+        with tempfile.TemporaryDirectory() as data_dir:
+            current = run_benchmarks(args.sizes, data_dir, options)
+    else:
+        Path(args.data_dir).mkdir(parents=True, exist_ok=True)
+        current = run_benchmarks(args.sizes, args.data_dir, options)
+
+    for result in current["results"]:
+        peak = "-" if result["peak_bytes"] is None else f"{result['peak_bytes'] / (1 << 20):.1f} MiB"
+        table = f", table {result['table_bytes'] / (1 << 20):.2f} MiB" if "table_bytes" in result else ""
+        per_job = f", {result['bytes_per_job']:.0f} B/job" if "bytes_per_job" in result else ""
+        recall = ""
+        if "recall" in result:
+            recall = f", recall {result['recall']:.2f} with {result['avg_candidates']:.0f} candidates"
+        print(f"{result['stage']:>24} {result['size']:>9} jobs: "
+              f"{result['seconds_per_call'] * 1000:10.4f} ms/call, peak {peak}{table}{per_job}{recall}")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(current, output, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, "r", encoding="utf-8") as baseline:
+            regressions = compare_results(current, json.load(baseline), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION:", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
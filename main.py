@@ -15,8 +15,29 @@ please contact us through Github using the "contact" button within our applicati
 This file is Copyright (c) 2024 Kush Gandhi, Sherwin Okhowat, David Cen, Tony Qi.
 """
 
+import argparse
 from src.gui import gui
 from src.scrape import scrape
+from src.similarity import parse_memory_size
+
+# The smallest --top-k which fills the similar jobs of the GUI, which samples 5 jobs from
+# the 5 + 10 most similar jobs
+MIN_TOP_K = 15
+
+
+def parse_top_k(value: str) -> int:
+    """
+    Returns the --top-k <value> as an integer.
+
+    Raises argparse.ArgumentTypeError if <value> is not an integer of at least MIN_TOP_K.
+    """
+    try:
+        top_k = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if top_k < MIN_TOP_K:
+        raise argparse.ArgumentTypeError(f"must be at least {MIN_TOP_K}, the number of jobs the GUI samples from")
+    return top_k
 
 
 def career_compass() -> None:
@@ -31,7 +52,21 @@ def career_compass() -> None:
     # prevent any file locking issues (csv may not write to it otherwise).
 
     # scrape()
-    gui()
+    parser = argparse.ArgumentParser(description="Run CareerCompass.")
+    parser.add_argument(
+        "--top-k", type=parse_top_k, default=None,
+        help="keep only each job's TOP_K most similar jobs instead of a complete graph",
+    )
+    parser.add_argument(
+        "--max-build-memory", type=parse_memory_size, default=None,
+        help="the most memory to use while computing similarity scores, such as 2G or 512M",
+    )
+    parser.add_argument(
+        "--answer-table", action="store_true",
+        help="precompute the jobs matching every combination of preferences at load time",
+    )
+    args = parser.parse_args()
+    gui({"top_k": args.top_k, "max_build_memory": args.max_build_memory, "answer_table": args.answer_table})
 
 
 if __name__ == "__main__":
@@ -41,6 +76,6 @@ if __name__ == "__main__":
     python_ta.check_all(
         config={
             "max-line-length": 120,
-            "extra-imports": ["gui, scrape"],
+            "extra-imports": ["argparse", "gui, scrape", "similarity"],
         }
     )
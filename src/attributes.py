@@ -0,0 +1,263 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the attribute index of our application, an inverted index
+which answers arbitrary conjunctive queries over job attributes (such as "remote, with
+python, in Canada, paying at least $50000 a year") with bitwise operations.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from typing import Any, Callable, Optional
+import numpy as np
+from src.job import Job
+from src.registry import JobRegistry
+
+
+class AttributeIndex:
+    """
+    Class representing an inverted index over the attributes of job postings.
+
+    Each job is identified by its integer id in self.registry, and a set of jobs is stored
+    as a bitset: a Python int whose i-th bit is 1 if and only if the job with integer id
+    i is in the set. The index keeps one bitset per yes/no attribute and one per value of
+    each categorical attribute, so a query is a few bitwise ANDs and ORs of whole bitsets.
+    Numeric attributes (such as rating or pay) are kept as columns, and a range of values
+    is turned into a bitset when it is queried.
+
+    By default, every job's attributes from Job.get_attributes are indexed as yes/no
+    attributes, its country and city as categorical attributes, and its rating and annual
+    pay as numeric attributes. More attributes can be added with add_attribute.
+
+    Instance Attributes:
+    - registry: The registry of the jobs in this index.
+
+    Private Instance Attributes:
+    - _all: The bitset of every job in this index.
+    - _flags: The function computing each yes/no attribute of a job added with
+    add_attribute, besides those of Job.get_attributes.
+    - _categories: The function computing each categorical attribute of a job.
+    - _numbers: The function computing each numeric attribute of a job.
+    - _bitsets: For each yes/no attribute, the bitset of the jobs for which it is True.
+    - _values: For each categorical attribute, the bitset of the jobs with each value.
+    - _columns: For each numeric attribute, its value for the job with each integer id,
+    or NaN for ids of jobs which are not in this index. Each column may be longer than
+    the number of registered jobs, to leave room for more.
+
+    Representation Invariants:
+    - all(bitset & ~self._all == 0 for bitset in self._bitsets.values())
+    - set(self._flags) <= set(self._bitsets)
+    - set(self._values) == set(self._categories)
+    - set(self._columns) == set(self._numbers)
+    """
+
+    registry: JobRegistry
+    _all: int
+    _flags: dict[str, Callable[[Job], bool]]
+    _categories: dict[str, Callable[[Job], Any]]
+    _numbers: dict[str, Callable[[Job], float]]
+    _bitsets: dict[str, int]
+    _values: dict[str, dict[Any, int]]
+    _columns: dict[str, np.ndarray]
+
+    def __init__(self, registry: Optional[JobRegistry] = None, jobs: Optional[list[Job]] = None) -> None:
+        """
+        Initialize an AttributeIndex of the jobs in <registry> (a new, empty registry if
+        <registry> is None), indexing every job in <jobs>.
+        """
+        self.registry = JobRegistry() if registry is None else registry
+        self._all = 0
+        self._flags = {}
+        self._categories = {
+            "country": lambda job: job.country,
+            "city": lambda job: job.city,
+        }
+        self._numbers = {
+            "rating": lambda job: job.rating,
+            "pay": Job.get_annual_pay,
+        }
+        self._bitsets = {}
+        self._values = {name: {} for name in self._categories}
+        self._columns = {name: np.empty(0) for name in self._numbers}
+        for job in jobs or []:
+            self.insert(job)
+
+    def insert(self, job: Job) -> None:
+        """
+        Indexes every attribute of <job>, registering it in self.registry if it is not already.
+        """
+        job = self.registry.add(job)
+        bit = 1 << job.id
+        self._all |= bit
+
+        for name, flag in job.get_attributes().items():
+            self._bitsets[name] = self._bitsets.get(name, 0) | (bit if flag else 0)
+        for name, flag in self._flags.items():
+            if flag(job):
+                self._bitsets[name] |= bit
+
+        for name, category in self._categories.items():
+            value = category(job)
+            self._values[name][value] = self._values[name].get(value, 0) | bit
+
+        for name, number in self._numbers.items():
+            if job.id >= len(self._columns[name]):
+                column = np.full(max(job.id + 1, 2 * len(self._columns[name])), np.nan)
+                column[:len(self._columns[name])] = self._columns[name]
+                self._columns[name] = column
+            self._columns[name][job.id] = number(job)
+
+    def remove(self, job: Job) -> None:
+        """
+        Removes <job> from this index.
+
+        Preconditions:
+        - job is in this index
+        """
+        mask = ~(1 << job.id)
+        self._all &= mask
+        for name in self._bitsets:
+            self._bitsets[name] &= mask
+        for values in self._values.values():
+            for value in values:
+                values[value] &= mask
+        for column in self._columns.values():
+            column[job.id] = np.nan
+
+    def add_attribute(self, name: str, attribute: Callable[[Job], Any], kind: str = "flag") -> None:
+        """
+        Adds the attribute <name> of every job, computed by <attribute>, and indexes it
+        for every job already in this index.
+
+        If <kind> is "flag", <attribute> returns whether the attribute holds for a job. If
+        <kind> is "category", it returns the job's value, e.g. its state. If <kind> is
+        "number", it returns the job's value as a float, e.g. its number of skills.
+
+        Raises ValueError if <kind> is not one of these, or an attribute <name> already exists.
+        """
+        if name in self._bitsets or name in self._categories or name in self._numbers:
+            raise ValueError(f"The attribute {name!r} already exists!")
+
+        jobs = self.jobs(self._all)
+        if kind == "flag":
+            self._flags[name] = attribute
+            self._bitsets[name] = _bitset([job.id for job in jobs if attribute(job)])
+        elif kind == "category":
+            self._categories[name] = attribute
+            ids = {}
+            for job in jobs:
+                ids.setdefault(attribute(job), []).append(job.id)
+            self._values[name] = {value: _bitset(value_ids) for value, value_ids in ids.items()}
+        elif kind == "number":
+            self._numbers[name] = attribute
+            column = np.full(len(self.registry.jobs), np.nan)
+            for job in jobs:
+                column[job.id] = attribute(job)
+            self._columns[name] = column
+        else:
+            raise ValueError(f"Unknown attribute kind: {kind!r}")
+
+    def query(self, where: dict[str, Any]) -> int:
+        """
+        Returns the bitset of the jobs satisfying every condition in <where>, which maps
+        the name of an attribute to:
+        - True or False, if it is a yes/no attribute
+        - a value, or a set of values any of which may match, if it is categorical
+        - a tuple (low, high), if it is numeric, which matches values v such that
+        low <= v <= high, where either bound may be None
+
+        Raises ValueError if <where> names an attribute which does not exist.
+        """
+        result = self._all
+        for name, condition in where.items():
+            if name in self._bitsets:
+                result &= self._bitsets[name] if condition else ~self._bitsets[name]
+            elif name in self._values:
+                values = condition if isinstance(condition, (set, frozenset)) else {condition}
+                matches = 0
+                for value in values:
+                    matches |= self._values[name].get(value, 0)
+                result &= matches
+            elif name in self._columns:
+                result &= self._range(name, *condition)
+            else:
+                raise ValueError(f"Unknown attribute: {name!r}")
+        return result
+
+    def _range(self, name: str, low: Optional[float], high: Optional[float]) -> int:
+        """
+        Returns the bitset of the jobs whose numeric attribute <name> is between <low> and
+        <high>, inclusive, where a bound of None is ignored.
+        """
+        column = self._columns[name]
+        matches = ~np.isnan(column)
+        if low is not None:
+            matches &= column >= low
+        if high is not None:
+            matches &= column <= high
+        return _bitset(np.flatnonzero(matches))
+
+    def jobs(self, bitset: int) -> list[Job]:
+        """
+        Returns the jobs in <bitset>, in order of their integer id.
+
+        The bitset is decoded in one pass (see _ids), since clearing its bits one at a time
+        copies the whole integer for every job.
+        """
+        registry = self.registry
+        return [registry[i] for i in _ids(bitset).tolist()]
+
+    def count(self, bitset: int) -> int:
+        """
+        Returns the number of jobs in <bitset>.
+        """
+        return bitset.bit_count()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of jobs in this index.
+        """
+        return self._all.bit_count()
+
+
+def _bitset(ids: list[int] | np.ndarray) -> int:
+    """
+    Returns the bitset of the integer ids <ids>, built in one pass rather than one bit at a time.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(ids) == 0:
+        return 0
+    mask = np.zeros(int(ids.max()) + 1, dtype=bool)
+    mask[ids] = True
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def _ids(bitset: int) -> np.ndarray:
+    """
+    Returns the integer ids in <bitset> in increasing order, the inverse of _bitset.
+
+    Preconditions:
+    - bitset >= 0
+    """
+    data = bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")
+    return np.flatnonzero(np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little"))
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    # NOTES FOR PYTHON-TA:
+    python_ta.check_all(
+        config={
+            "max-line-length": 120,
+            "extra-imports": ["typing", "numpy", "job", "registry"],
+        }
+    )
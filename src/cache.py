@@ -0,0 +1,102 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the persistent similarity cache of our application,
+which stores computed similarity scores on disk so that later launches can
+memory-map them instead of recomputing them.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from typing import Optional
+from pathlib import Path
+import hashlib
+import os
+import numpy as np
+from src.utility import SIMILARITY_WEIGHTS
+
+# Bump this whenever the similarity formulas or the cache layout change, so that
+# previously written caches are invalidated.
+CACHE_VERSION = 1
+
+
+def cache_key(file: str = "data/jobs.csv") -> str:
+    """
+    Returns a key identifying the similarity scores computed from <file>.
+
+    The key is a hash of the contents of <file>, the similarity weights and the cache
+    version, so it changes whenever any of them do.
+    """
+    digest = hashlib.sha256()
+    with open(file, "rb") as csvfile:
+        for chunk in iter(lambda: csvfile.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(repr((CACHE_VERSION, SIMILARITY_WEIGHTS)).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def profile_tag(profile: dict[str, float]) -> str:
+    """
+    Returns a short tag identifying the weight profile <profile>, used to tell apart the
+    similarity scores cached under the same key for different profiles.
+    """
+    return hashlib.sha256(repr(sorted(profile.items())).encode("utf-8")).hexdigest()[:12]
+
+
+def load_cached(key: str, name: str, directory: str = "data/cache") -> Optional[np.ndarray]:
+    """
+    Returns the array <name> cached under <key> in <directory>, memory-mapped read-only,
+    or None if there is no such array.
+    """
+    path = Path(directory) / f"{key}.{name}.npy"
+    if not path.is_file():
+        return None
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:  # a truncated or otherwise corrupt cache file
+        return None
+
+
+def save_cached(key: str, arrays: dict[str, np.ndarray], directory: str = "data/cache") -> None:
+    """
+    Writes each array in <arrays> to <directory>, cached under <key> and its name, and
+    removes every cache file in <directory> belonging to a different (i.e., stale) key.
+
+    Each array is saved under a .tmp name and only then renamed to its .npy name, which is
+    all load_cached looks for, so an interrupted build never leaves a truncated array that
+    a later launch would memory-map.
+    """
+    folder = Path(directory)
+    folder.mkdir(parents=True, exist_ok=True)
+    for stale in folder.glob("*.npy"):
+        if not stale.name.startswith(f"{key}."):
+            stale.unlink()
+
+    for name, array in arrays.items():
+        path = folder / f"{key}.{name}.npy"
+        temp_path = folder / f"{key}.{name}.tmp"
+        with open(temp_path, "wb") as file:
+            np.save(file, array)
+        os.replace(temp_path, path)
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    # NOTES FOR PYTHON-TA:
+    # 1. E9998 (Forbidden-IO-Function): Necessary for reading and writing our cache files
+    python_ta.check_all(
+        config={
+            "max-line-length": 120,
+            "extra-imports": ["typing", "pathlib", "hashlib", "os", "numpy", "utility"],
+            "disable": ["E9998"],
+        }
+    )
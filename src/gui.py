@@ -15,6 +15,7 @@ please contact us through Github using the "contact" button within our applicati
 This file is Copyright (c) 2024 Kush Gandhi, Sherwin Okhowat, David Cen, Tony Qi.
 """
 
+from typing import Any, Optional
 from pathlib import Path
 import webbrowser
 import tkinter as tk
@@ -57,9 +58,11 @@ class CareerCompass:
     container: tk.Frame
     pages: dict
 
-    def __init__(self, root: tk.Tk) -> None:
+    def __init__(self, root: tk.Tk, build_options: Optional[dict[str, Any]] = None) -> None:
         """
         Initialize the CareerCompass application
+
+        <build_options> are passed as keyword arguments to load_graph_and_tree.
         """
 
         # Creating container for the pages
@@ -120,7 +123,7 @@ class CareerCompass:
         self.job_postings = []
 
         # Loading decision tree and weighted graph
-        self.structs = load_graph_and_tree()
+        self.structs = load_graph_and_tree(**(build_options or {}))
 
         # Getting size of data set
         self.facts = {
@@ -545,8 +548,8 @@ class PreferencesPage(ttk.Frame):
                 else:
                     new_preferences.append(2)
 
-            # Getting Job Postings
-            self.app.job_postings = self.app.structs[1].get_jobs(new_preferences)
+            # Getting the best matching Job Postings
+            self.app.job_postings = self.app.structs[1].get_top_jobs(new_preferences)
 
             # Creating the job postings
             self.app.show_pages("JobsPage")
@@ -850,9 +853,11 @@ class JobsPage(ttk.Frame):
         self.app.show_pages("HomePage")
 
 
-def gui() -> None:
+def gui(build_options: Optional[dict[str, Any]] = None) -> None:
     """
     Creates the main window for the application
+
+    <build_options> are passed as keyword arguments to load_graph_and_tree.
     """
     root = tk.Tk()
     root.title("CareerCompass")
@@ -860,7 +865,7 @@ def gui() -> None:
     root.resizable(False, False)
 
     # Create the CareerCompass object
-    CareerCompass(root)
+    CareerCompass(root, build_options)
 
     # Run the main loop
     root.mainloop()
@@ -877,6 +882,7 @@ if __name__ == "__main__":
         config={
             "max-line-length": 120,
             "extra-imports": [
+                "typing",
                 "tkinter",
                 "PIL",
                 "pathlib",
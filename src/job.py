@@ -15,137 +15,395 @@ please contact us through Github using the "contact" button within our applicati
 This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
 """
 
-from typing import Any
+from __future__ import annotations
+from typing import Any, Iterable, Iterator, Optional
+from collections.abc import Mapping
 from random import randint
 from re import sub
+from math import sin, cos, pi
+from sys import intern
+from ast import literal_eval
+import zlib
+
+# The integer code assigned to each country seen so far, shared by every Job instance
+_COUNTRY_CODES: dict[str, int] = {}
+
+# The attribute of Job holding each field of Job.job_details, in the column order of jobs.csv
+_DETAIL_ATTRIBUTES = {
+    "job_title": "job_title",
+    "employer_name": "employer_name",
+    "rating": "rating",
+    "link": "link",
+    "fragmented_desc": "fragmented_desc",
+    "skills": "skills",
+    "latitutde": "latitude",
+    "longitude": "longitude",
+    "city": "city",
+    "country": "country",
+    "pay_period": "pay_period",
+    "pay": "pay",
+    "job_id": "job_id",
+    "full_desc": "full_desc",
+}
+
+# Every field of Job.job_details, in the column order of jobs.csv
+JOB_FIELDS = list(_DETAIL_ATTRIBUTES)
+
+# The number of decisions made by every job, i.e., the questions of Job._get_decision_decisions
+NUM_DECISIONS = 7
+
+# The yes/no attributes of every job returned by Job.get_attributes, in the bit order of
+# Job.attribute_flags
+ATTRIBUTE_NAMES = ["remote", "frontend", "fullstack", "python", "java", "c++"]
+
+
+class KeywordMatcher:
+    """
+    Class representing a matcher of a fixed set of keywords, which finds every keyword
+    occurring in some pieces of text while lowercasing each piece only once.
+
+    The pieces of text are lowercased and joined once per call, then searched for each
+    keyword with Python's substring search. This finds the same keywords as searching
+    each lowercased piece on its own, and is faster in CPython than one combined regular
+    expression or a pure Python automaton, since each search runs in C.
+
+    Instance Attributes:
+    - keywords: the keywords of this matcher, in lowercase and without duplicates.
+
+    Representation Invariants:
+    - all(keyword == keyword.lower() for keyword in self.keywords)
+    - all("\x00" not in keyword for keyword in self.keywords)
+    """
+
+    keywords: tuple[str, ...]
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        """
+        Initialize a KeywordMatcher of <keywords>, ignoring case.
+
+        Preconditions:
+        - all("\x00" not in keyword for keyword in keywords)
+        """
+        self.keywords = tuple(dict.fromkeys(keyword.lower() for keyword in keywords))
+
+    def find(self, *texts: str) -> set[str]:
+        """
+        Returns the keywords of this matcher occurring in at least one of <texts>,
+        ignoring case. A keyword never matches across two of <texts>.
+        """
+        text = "\x00".join(texts).lower()
+        return {keyword for keyword in self.keywords if keyword in text}
+
+
+# The keywords looked for in the title and descriptions of every job, all found at once
+# when the job is constructed. The keywords of any new question should be added here.
+JOB_KEYWORDS = KeywordMatcher(
+    ["remote", "frontend", "front-end", "fullstack", "full-stack", "full stack", "python", "java", "c++"]
+)
+
+
+class JobFeatures:
+    """
+    Class representing the derived features of a job posting used by the similarity
+    calculation, computed once so that comparing two jobs does no repeated per-job work.
+
+    Instance Attributes:
+    - lat: The latitude of the job, in radians.
+    - lng: The longitude of the job, in radians.
+    - sin_lat: The sine of self.lat.
+    - cos_lat: The cosine of self.lat.
+    - annual_pay: The annual pay of the job.
+    - skills: The set of characters of the job's skills string, e.g. {'[', "'", 'S', ...}
+    for "['SQL']". These are not skill names: the similarity calculation has always
+    compared the characters of the skills strings, and keeps doing so to preserve its scores.
+    - skill_names: The names of the job's skills, in lowercase, parsed from its skills
+    string by parse_skills.
+    - country_code: An integer code for the job's country, equal for two jobs if and
+    only if their countries are equal.
+    """
+
+    __slots__ = ("lat", "lng", "sin_lat", "cos_lat", "annual_pay", "skills", "skill_names", "country_code")
+
+    lat: float
+    lng: float
+    sin_lat: float
+    cos_lat: float
+    annual_pay: float
+    skills: frozenset
+    skill_names: frozenset[str]
+    country_code: int
+
+    def __init__(
+        self, job_details: dict[str, Any], annual_pay: float, skill_names: Optional[frozenset[str]] = None
+    ) -> None:
+        """
+        Initialize the features of the job described by <job_details>, whose annual pay
+        is <annual_pay>.
+
+        If <skill_names> is not None, they are used as the job's skill names instead of
+        parsing job_details['skills'] again.
+        """
+        self.lat = job_details["latitutde"] * (pi / 180.0)
+        self.lng = job_details["longitude"] * (pi / 180.0)
+        self.sin_lat = sin(self.lat)
+        self.cos_lat = cos(self.lat)
+        self.annual_pay = annual_pay
+        self.skills = frozenset(job_details["skills"])
+        self.skill_names = parse_skills(job_details["skills"]) if skill_names is None else skill_names
+        self.country_code = _COUNTRY_CODES.setdefault(job_details["country"], len(_COUNTRY_CODES))
 
 
 class Job:
     """
     Class representing a job posting instance.
 
+    Each field of a job posting is kept in its own slot rather than in a dict per job.
+    Categorical fields repeated across many jobs (the employer name, city, country and
+    pay period) are interned, so every job shares one copy of each distinct value. The
+    descriptions, by far the largest fields, are stored out of line as compressed UTF-8
+    and only decompressed when they are read.
+
     Instance Attributes:
-    - job_details: a dictionary representing this Job instance's details.
+    - job_title: the title of this job.
+    - employer_name: the name of this job's employer.
+    - rating: the rating of this job's employer.
+    - link: the link to this job's posting.
+    - skills: the skills listed by this job.
+    - latitude: the latitude of this job's location.
+    - longitude: the longitude of this job's location.
+    - city: the city of this job, or "" if it has none.
+    - country: the country of this job.
+    - pay_period: the period this job's pay is given per.
+    - pay: this job's pay, per self.pay_period.
+    - job_id: the job id of this job's posting.
     - decisions: an ordered sequence of an integers representing the path of questions
     which this job instance traverses the decision tree.
+    - attribute_flags: the yes/no attributes of this job (see get_attributes), where bit i
+    is set if and only if the attribute ATTRIBUTE_NAMES[i] is True.
+    - features: the derived features of this job used by the similarity calculation.
+    - id: the dense integer id assigned to this job by a JobRegistry, or None if it has
+    not been registered.
+
+    Private Instance Attributes:
+    - _fragmented_desc: the fragmented description of this job, without html tags,
+    packed by _pack_text.
+    - _full_desc: the full description of this job, packed by _pack_text.
 
     Representation Invariants:
-    - 'job_title' in self.job_details
-    - 'employer_name' in self.job_details
-    - 'rating' in self.job_details
-    - 'link' in self.job_details
-    - 'fragmented_desc' in self.job_details
-    - 'skills' in self.job_details
-    - 'latitutde' in self.job_details
-    - 'longitude' in self.job_details
-    - 'city' in self.job_details
-    - 'country' in self.job_details
-    - 'pay_period' in self.job_details
-    - 'pay' in self.job_details
-    - 'job_id' in self.job_details
-    - 'full_desc' in self.job_details
-    - self.job_details['country'] in {'Canada', 'United States'}
-    - self.job_details['pay_period'] in {'ANNUAL', 'MONTHLY, 'HOURLY'}
+    - self.country in {'Canada', 'United States'}
+    - self.pay_period in {'ANNUAL', 'MONTHLY, 'HOURLY'}
     """
 
-    job_details: dict[str, Any]
+    __slots__ = (
+        "job_title", "employer_name", "rating", "link", "skills", "latitude", "longitude", "city",
+        "country", "pay_period", "pay", "job_id", "decisions", "attribute_flags", "features", "id",
+        "_fragmented_desc", "_full_desc",
+    )
+
+    job_title: str
+    employer_name: str
+    rating: float
+    link: str
+    skills: str
+    latitude: float
+    longitude: float
+    city: str
+    country: str
+    pay_period: str
+    pay: float
+    job_id: str
     decisions: list[int]
+    attribute_flags: int
+    features: JobFeatures
+    id: Optional[int]
+    _fragmented_desc: bytes
+    _full_desc: bytes
 
     def __init__(self, job_details: dict[str, Any]) -> None:
         """
         Constructor for a Job instance.
 
         Preconditions:
-        - 'job_title' in job_details
-        - 'employer_name' in job_details
-        - 'rating' in job_details
-        - 'link' in job_details
-        - 'fragmented_desc' in job_details
-        - 'skills' in job_details
-        - 'latitutde' in job_details
-        - 'longitude' in job_details
-        - 'city' in job_details
-        - 'country' in job_details
-        - 'pay_period' in self.job_details
-        - 'pay' in self.job_details
-        - 'job_id' in job_details
-        - 'full_desc' in job_details
-        """
-        self.job_details = job_details
-        self.decisions = self._get_decision_decisions()
-        self._sanitize_description()
+        - all(field in job_details for field in JOB_FIELDS)
+        """
+        self._set_fields(job_details)
+        fragmented_desc, full_desc = job_details["fragmented_desc"], job_details["full_desc"]
+        keywords = JOB_KEYWORDS.find(self.job_title, fragmented_desc, full_desc)
+        self.decisions = self._get_decision_decisions(keywords)
+        self.attribute_flags = self._get_attribute_flags(keywords)
+        self._fragmented_desc = _pack_text(self._sanitize_description(fragmented_desc))
+        self._full_desc = _pack_text(full_desc)
+        self.features = JobFeatures(job_details, self.get_annual_pay())
+        self.id = None
+
+    @classmethod
+    def restore(
+        cls, job_details: dict[str, Any], decisions: list[int], attribute_flags: int,
+        packed_descs: tuple[bytes, bytes], skill_names: frozenset[str]
+    ) -> Job:
+        """
+        Returns the Job restored from the state saved by a snapshot, without finding its
+        keywords, sanitizing and packing its descriptions or parsing its skills again.
+
+        <packed_descs> are the job's fragmented and full descriptions as packed by
+        _pack_text, <decisions>, <attribute_flags> and <skill_names> are its decisions,
+        attribute_flags and features.skill_names, and <job_details> holds its other fields.
+
+        Preconditions:
+        - all(field in job_details for field in JOB_FIELDS if field not in {'fragmented_desc', 'full_desc'})
+        """
+        job = cls.__new__(cls)
+        job._set_fields(job_details)
+        job.decisions = decisions
+        job.attribute_flags = attribute_flags
+        job._fragmented_desc, job._full_desc = packed_descs
+        job.features = JobFeatures(job_details, job.get_annual_pay(), skill_names)
+        job.id = None
+        return job
+
+    def _set_fields(self, job_details: dict[str, Any]) -> None:
+        """
+        Sets every field of this job from <job_details>, other than its descriptions.
+        """
+        self.job_title = job_details["job_title"]
+        self.employer_name = intern(job_details["employer_name"])
+        self.rating = job_details["rating"]
+        self.link = job_details["link"]
+        self.skills = job_details["skills"]
+        self.latitude = job_details["latitutde"]
+        self.longitude = job_details["longitude"]
+        self.city = intern(job_details["city"])
+        self.country = intern(job_details["country"])
+        self.pay_period = intern(job_details["pay_period"])
+        self.pay = job_details["pay"]
+        self.job_id = job_details["job_id"]
+
+    @property
+    def fragmented_desc(self) -> str:
+        """
+        Returns the fragmented description of this job, without html tags.
+        """
+        return _unpack_text(self._fragmented_desc)
+
+    @property
+    def full_desc(self) -> str:
+        """
+        Returns the full description of this job.
+        """
+        return _unpack_text(self._full_desc)
+
+    @property
+    def packed_descs(self) -> tuple[bytes, bytes]:
+        """
+        Returns the fragmented and full descriptions of this job as packed by _pack_text,
+        which Job.restore takes back without packing them again.
+        """
+        return self._fragmented_desc, self._full_desc
+
+    @property
+    def job_details(self) -> JobDetails:
+        """
+        Returns a read-only view of the fields of this job, keyed by the columns of
+        jobs.csv (see JOB_FIELDS), like the dict of details it was constructed from.
+        """
+        return JobDetails(self)
 
     def __str__(self) -> str:
         """
         Returns the string representation of this job, which is simply the job id.
         """
-        return self.job_details["job_id"]
+        return self.job_id
 
     def get_annual_pay(self) -> float:
         """
         Returns the annual pay conversion for this Job instance.
 
-        If self.job_details['pay_period'] != 'Annual', then the
+        If self.pay_period != 'Annual', then the
         appropriate conversions are made.
         """
-        if self.job_details["pay_period"] == "HOURLY":
-            estimated_salary = 40 * 52 * self.job_details["pay"]
-        elif self.job_details["pay_period"] == "MONTHLY":
-            estimated_salary = 12 * self.job_details["pay"]
+        if self.pay_period == "HOURLY":
+            estimated_salary = 40 * 52 * self.pay
+        elif self.pay_period == "MONTHLY":
+            estimated_salary = 12 * self.pay
         else:
-            estimated_salary = self.job_details["pay"]
+            estimated_salary = self.pay
 
         return estimated_salary
 
-    def _check_keyword(self, keyword: str) -> bool:
+    def _check_remote(self, keywords: set[str]) -> bool:
+        """
+        Returns whether this Job instance is remote, given the <keywords> found
+        when it was constructed.
+        """
+        return "remote" in keywords
+
+    def _check_frontend(self, keywords: set[str]) -> bool:
         """
-        Returns whether <keyword> is in at least one of
-        the job title, fragmented description, or full description.
+        Returns whether this Job instance is likely to be frontend, given the <keywords>
+        found when it was constructed.
         """
-        if keyword in str.lower(self.job_details["job_title"]):
+        return "frontend" in keywords or "front-end" in keywords
+
+    def _check_fullstack(self, keywords: set[str]) -> bool:
+        """
+        Returns whether this Job instance is likely to be fullstack, given the <keywords>
+        found when it was constructed.
+        """
+        if "fullstack" in keywords:
             return True
-        elif keyword in str.lower(self.job_details["fragmented_desc"]):
+        elif "full-stack" in keywords:
             return True
-        elif keyword in str.lower(self.job_details["full_desc"]):
+        elif "full stack" in keywords:
             return True
         else:
             return False
 
-    def _check_remote(self) -> bool:
+    def _check_skill(self, skill: str, keywords: set[str]) -> bool:
         """
-        Returns whether this Job instance is remote.
+        Returns whether this Job instance lists <skill> as a skill, or mentions it,
+        given the <keywords> found when it was constructed.
+
+        Preconditions:
+        - skill in JOB_KEYWORDS.keywords
         """
-        return self._check_keyword("remote")
+        if any([skill == str.lower(listed) for listed in self.skills]):
+            return True
+        else:
+            return skill in keywords
 
-    def _check_frontend(self) -> bool:
+    def get_attributes(self) -> dict[str, bool]:
         """
-        Returns whether this Job instance is likely to be frontend.
+        Returns the yes/no attributes of this Job instance: whether it is remote, frontend
+        or fullstack, and whether it asks for python, java or c++.
+
+        Unlike the decisions of this job, a fullstack job is neither frontend nor backend
+        at random, so both "frontend" and "fullstack" may be True.
         """
-        return self._check_keyword("frontend") or self._check_keyword("front-end")
+        return {name: bool(self.attribute_flags >> i & 1) for i, name in enumerate(ATTRIBUTE_NAMES)}
 
-    def _check_fullstack(self) -> bool:
+    def _get_attribute_flags(self, keywords: set[str]) -> int:
         """
-        Returns whether this Job instance is likely to be fullstack.
+        Returns the attribute_flags of this Job instance, from the same <keywords> as its
+        decisions, so that both agree on whether the job is remote, frontend, etc.
         """
-        if self._check_keyword("fullstack"):
-            return True
-        elif self._check_keyword("full-stack"):
-            return True
-        elif self._check_keyword("full stack"):
-            return True
-        else:
-            return False
+        flags = [
+            self._check_remote(keywords),
+            self._check_frontend(keywords),
+            self._check_fullstack(keywords),
+            self._check_skill("python", keywords),
+            self._check_skill("java", keywords),
+            self._check_skill("c++", keywords),
+        ]
+        return sum(1 << i for i, flag in enumerate(flags) if flag)
 
-    def _sanitize_description(self) -> None:
+    def _sanitize_description(self, desc: str) -> str:
         """
-        Sanitizes self.job_details['fragmented_desc'], by removing
+        Returns the fragmented description <desc> sanitized, by removing
         all html tags using a regular expression query.
         """
-        desc = self.job_details["fragmented_desc"]
-        clean_desc = sub("<[^<]+?>", "", desc)
-        self.job_details["fragmented_desc"] = clean_desc
+        return sub("<[^<]+?>", "", desc)
 
-    def _get_decision_decisions(self) -> list[int]:
+    def _get_decision_decisions(self, keywords: set[str]) -> list[int]:
         """
         Returns a list of integers representing this job instances
         responses to the following questions:
@@ -156,48 +414,45 @@ class Job:
         5. Python or No Python (1 or 0)
         6. Java or No Java (1 or 0)
         7. C++ or No C++ (1 or 0)
+
+        <keywords> are the keywords of JOB_KEYWORDS in the job's title and descriptions,
+        found before its fragmented description is sanitized.
         """
         decisions = []
-        if self.job_details["country"] == "United States":
+        if self.country == "United States":
             decisions.append(1)
         else:
             decisions.append(0)
 
-        if self._check_remote():
+        if self._check_remote(keywords):
             decisions.append(1)
         else:
             decisions.append(0)
 
-        if self._check_fullstack():
+        if self._check_fullstack(keywords):
             decisions.append(randint(0, 1))
         else:
-            if self._check_frontend():
+            if self._check_frontend(keywords):
                 decisions.append(1)
             else:
                 decisions.append(0)
 
-        if self.job_details["rating"] >= 3:
+        if self.rating >= 3:
             decisions.append(1)
         else:
             decisions.append(0)
 
-        if any(["python" == str.lower(skill) for skill in self.job_details["skills"]]):
-            decisions.append(1)
-        elif self._check_keyword("python"):
+        if self._check_skill("python", keywords):
             decisions.append(1)
         else:
             decisions.append(0)
 
-        if any(["java" == str.lower(skill) for skill in self.job_details["skills"]]):
-            decisions.append(1)
-        elif self._check_keyword("java"):
+        if self._check_skill("java", keywords):
             decisions.append(1)
         else:
             decisions.append(0)
 
-        if any(["c++" == str.lower(skill) for skill in self.job_details["skills"]]):
-            decisions.append(1)
-        elif self._check_keyword("c++"):
+        if self._check_skill("c++", keywords):
             decisions.append(1)
         else:
             decisions.append(0)
@@ -205,6 +460,76 @@ class Job:
         return decisions
 
 
+class JobDetails(Mapping):
+    """
+    Class representing a read-only view of the fields of a Job, keyed by the names of
+    the columns of jobs.csv, which can be used wherever the dict of a job's details was.
+
+    Private Instance Attributes:
+    - _job: The job whose fields are viewed.
+    """
+
+    __slots__ = ("_job",)
+
+    _job: Job
+
+    def __init__(self, job: Job) -> None:
+        """
+        Initialize a view of the fields of <job>.
+        """
+        self._job = job
+
+    def __getitem__(self, field: str) -> Any:
+        """
+        Returns the value of <field> of the viewed job.
+
+        Raises KeyError if <field> is not in JOB_FIELDS.
+        """
+        return getattr(self._job, _DETAIL_ATTRIBUTES[field])
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Returns an iterator over JOB_FIELDS.
+        """
+        return iter(JOB_FIELDS)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of fields of a job.
+        """
+        return len(JOB_FIELDS)
+
+
+def parse_skills(skills: Any) -> frozenset[str]:
+    """
+    Returns the names of the skills in <skills>, in lowercase, where <skills> is either
+    a list of skill names or the string representation of one, as stored in jobs.csv
+    (e.g. "['SQL', 'C', 'AWS']"). A string which is not such a representation is
+    taken to be a single skill, and an empty string to be no skills.
+    """
+    if isinstance(skills, str):
+        try:
+            parsed = literal_eval(skills)
+        except (ValueError, SyntaxError):
+            parsed = [skills] if skills.strip() else []
+        skills = parsed if isinstance(parsed, (list, tuple, set, frozenset)) else [parsed]
+    return frozenset(str(skill).strip().lower() for skill in skills)
+
+
+def _pack_text(text: str) -> bytes:
+    """
+    Returns <text> encoded in UTF-8 and compressed, to be stored out of line.
+    """
+    return zlib.compress(text.encode("utf-8"), 1)
+
+
+def _unpack_text(data: bytes) -> str:
+    """
+    Returns the text packed into <data> by _pack_text.
+    """
+    return zlib.decompress(data).decode("utf-8")
+
+
 if __name__ == "__main__":
     import python_ta
 
@@ -214,7 +539,7 @@ if __name__ == "__main__":
     python_ta.check_all(
         config={
             "max-line-length": 120,
-            "extra-imports": ["typing", "random", "re"],
+            "extra-imports": ["typing", "collections.abc", "random", "re", "math", "sys", "ast", "zlib"],
             "disable": ["R0912"],
         }
     )
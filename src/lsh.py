@@ -0,0 +1,223 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the approximate nearest neighbour index of our application,
+which uses MinHash locality-sensitive hashing (LSH) to find a small set of candidate
+similar jobs without scoring every job posting.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from __future__ import annotations
+from typing import Any, Optional
+from random import sample
+from zlib import crc32
+import time
+import numpy as np
+from src.job import Job
+from src.utility import similarity_calculation
+
+# A Mersenne prime larger than every token hash, used by the MinHash permutations
+_PRIME = (1 << 31) - 1
+
+
+def job_tokens(job: Job, pay_bucket_size: int = 10000) -> set[str]:
+    """
+    Returns the set of tokens describing <job> for MinHash: one per skill name (see
+    JobFeatures.skill_names), one for its country, and one for the bucket of width
+    <pay_bucket_size> its annual pay falls in.
+    """
+    tokens = {"skill:" + skill for skill in job.features.skill_names}
+    tokens.add("country:" + job.country)
+    tokens.add("pay:" + str(int(job.features.annual_pay // pay_bucket_size)))
+    return tokens
+
+
+class MinHashIndex:
+    """
+    Class representing a MinHash LSH index over a list of jobs.
+
+    Each job's tokens are summarized by a signature of num_bands * rows_per_band MinHash
+    values, which is split into num_bands bands. Two jobs are candidates for each other if
+    they agree on every value of at least one band. More bands (or fewer rows per band)
+    find more of the truly similar jobs, at the cost of larger candidate sets.
+
+    Instance Attributes:
+    - jobs: The jobs in this index.
+    - num_bands: The number of bands of each signature.
+    - rows_per_band: The number of MinHash values in each band.
+
+    Private Instance Attributes:
+    - _indices: The index of each job in self.jobs.
+    - _buckets: For each band, a mapping from the values of that band to the indices of the
+    jobs whose signatures have those values.
+    - _signatures: The MinHash signature of each job, one row per job.
+
+    Representation Invariants:
+    - self.num_bands > 0 and self.rows_per_band > 0
+    - len(self._buckets) == self.num_bands
+    - self._signatures.shape == (len(self.jobs), self.num_bands * self.rows_per_band)
+    """
+
+    jobs: list[Job]
+    num_bands: int
+    rows_per_band: int
+    _indices: dict[Job, int]
+    _buckets: list[dict[tuple[int, ...], list[int]]]
+    _signatures: np.ndarray
+
+    def __init__(self, jobs: list[Job], num_bands: int = 16, rows_per_band: int = 2,
+                 pay_bucket_size: int = 10000, seed: int = 0) -> None:
+        """
+        Initialize a MinHashIndex of <jobs>.
+
+        Preconditions:
+        - num_bands > 0 and rows_per_band > 0
+        - pay_bucket_size > 0
+        """
+        self.jobs = jobs
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+        self._indices = {job: i for i, job in enumerate(jobs)}
+
+        rng = np.random.default_rng(seed)
+        num_hashes = num_bands * rows_per_band
+        a = rng.integers(1, _PRIME, num_hashes, dtype=np.int64)[:, None]
+        b = rng.integers(0, _PRIME, num_hashes, dtype=np.int64)[:, None]
+
+        self._signatures = np.empty((len(jobs), num_hashes), dtype=np.int64)
+        for i, job in enumerate(jobs):
+            tokens = np.array(
+                [crc32(token.encode("utf-8")) % _PRIME for token in job_tokens(job, pay_bucket_size)],
+                dtype=np.int64,
+            )
+            self._signatures[i] = ((a * tokens[None, :] + b) % _PRIME).min(axis=1)
+
+        self._buckets = [{} for _ in range(num_bands)]
+        for i, signature in enumerate(self._signatures.tolist()):
+            for band in range(num_bands):
+                key = tuple(signature[band * rows_per_band:(band + 1) * rows_per_band])
+                self._buckets[band].setdefault(key, []).append(i)
+
+    def candidates(self, job: Job) -> set[Job]:
+        """
+        Returns the jobs which share at least one band bucket with <job>, excluding <job>.
+
+        Preconditions:
+        - job in self.jobs
+        """
+        i = self._indices[job]
+        signature = self._signatures[i].tolist()
+        found = set()
+        for band in range(self.num_bands):
+            key = tuple(signature[band * self.rows_per_band:(band + 1) * self.rows_per_band])
+            found.update(self._buckets[band][key])
+        found.discard(i)
+        return {self.jobs[j] for j in found}
+
+    def get_similar_jobs(
+        self, job: Job, limit: Optional[int] = 5, offset: Optional[int] = 10
+    ) -> list[Job]:
+        """
+        Returns <limit> jobs sampled from the <limit> + 10 candidates with the highest
+        similarity score to <job>, mirroring WeightedGraph.get_similar_jobs.
+
+        Only the candidates of <job> are scored, exactly, with similarity_calculation. If
+        there are fewer than <limit> + 10 candidates, every job is scored instead (see
+        top_candidates).
+        """
+        if (offset + limit) > len(self.jobs):
+            raise ValueError("Limit / Offset are too high!")
+        elif job not in self._indices:
+            raise ValueError("Job does not exist in this <MinHashIndex> instance!")
+
+        return sample(self.top_candidates(job, limit + 10), limit)
+
+    def top_candidates(self, job: Job, k: int) -> list[Job]:
+        """
+        Returns the (at most) <k> candidates with the highest similarity score to <job>,
+        from highest to lowest score. If <job> has fewer than <k> candidates, every other
+        job is a candidate.
+        """
+        candidates = self.candidates(job)
+        if len(candidates) < k:
+            candidates = [other for other in self.jobs if other is not job]
+
+        scored = sorted(
+            ((similarity_calculation(job, other), other) for other in candidates),
+            key=lambda item: item[0],
+            reverse=True,
+        )
+        return [other for _, other in scored[:k]]
+
+
+def benchmark_recall(
+    graph: Any, band_options: list[int], rows_per_band: int = 2,
+    num_queries: int = 100, k: int = 15, seed: int = 0
+) -> list[dict[str, float]]:
+    """
+    Returns, for each number of bands in <band_options>, the recall of a MinHashIndex with
+    that many bands against the exact top <k> neighbours of every job given by <graph>,
+    along with timings.
+
+    Recall is the average fraction of each query job's exact top <k> neighbours that the
+    index also returns in its top <k>, over <num_queries> randomly chosen query jobs.
+    Each result also reports the average number of candidates scored per query, and the
+    average query time in seconds of both the index and the exact graph, whose queries
+    are answered in one batch by get_similar_jobs_batch.
+
+    Preconditions:
+    - graph is a complete WeightedGraph, a sparse one keeping at least <k> neighbours per
+      job, or a LazyWeightedGraph
+    - num_queries > 0 and k > 0
+    """
+    jobs = list(graph.get_vertices())
+    queries = list(np.random.default_rng(seed).choice(len(jobs), min(num_queries, len(jobs)), replace=False))
+
+    start = time.perf_counter()
+    ranked = graph.get_similar_jobs_batch([jobs[q] for q in queries], k)
+    exact = {q: set(neighbours) for q, neighbours in zip(queries, ranked)}
+    exact_time = (time.perf_counter() - start) / len(queries)
+
+    results = []
+    for num_bands in band_options:
+        start = time.perf_counter()
+        index = MinHashIndex(jobs, num_bands, rows_per_band)
+        build_time = time.perf_counter() - start
+
+        recall = 0.0
+        start = time.perf_counter()
+        for q in queries:
+            recall += len(exact[q].intersection(index.top_candidates(jobs[q], k))) / len(exact[q])
+        query_time = (time.perf_counter() - start) / len(queries)
+        num_candidates = sum(len(index.candidates(jobs[q])) for q in queries)
+
+        results.append({
+            "num_bands": num_bands,
+            "recall": recall / len(queries),
+            "avg_candidates": num_candidates / len(queries),
+            "build_time": build_time,
+            "query_time": query_time,
+            "exact_query_time": exact_time,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    # NOTES FOR PYTHON-TA:
+    python_ta.check_all(
+        config={
+            "max-line-length": 120,
+            "extra-imports": ["typing", "random", "zlib", "time", "numpy", "job", "utility"],
+        }
+    )
@@ -0,0 +1,149 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the job registry of our application, which assigns
+every job posting a dense integer id and looks job postings up by their job id.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from typing import Iterator, Optional
+from src.job import Job
+
+
+class JobRegistry:
+    """
+    Class representing a registry of job postings, which assigns each distinct job id
+    a dense integer id: the index of its job in self.jobs.
+
+    Structures which store these integer ids rather than Job instances can be shared
+    between processes, and map them back to jobs through their registry.
+
+    The integer id of a removed job is freed and given to the next job registered, so
+    the registry does not grow as jobs expire and new ones are posted.
+
+    Instance Attributes:
+    - jobs: The registered jobs, in order of their integer id, with None at each free id.
+    - duplicates: The number of jobs which were merged into an already registered job
+    with the same job id.
+
+    Private Instance Attributes:
+    - _ids: The integer id of each registered job id.
+    - _free: The free integer ids, i.e., those of removed jobs.
+
+    Representation Invariants:
+    - all(self.jobs[i].id == i for i in range(len(self.jobs)) if self.jobs[i] is not None)
+    - all(self._ids[str(job)] == job.id for job in self.jobs if job is not None)
+    - all(self.jobs[i] is None for i in self._free)
+    """
+
+    jobs: list[Optional[Job]]
+    duplicates: int
+    _ids: dict[str, int]
+    _free: list[int]
+
+    def __init__(self, jobs: Optional[list[Job]] = None) -> None:
+        """
+        Initialize a JobRegistry, registering each job in <jobs> in order.
+        """
+        self.jobs = []
+        self.duplicates = 0
+        self._ids = {}
+        self._free = []
+        for job in jobs or []:
+            self.add(job)
+
+    def add(self, job: Job) -> Job:
+        """
+        Registers <job> and returns it, unless a job with the same job id is already
+        registered. In that case, <job> is merged into (i.e., replaced by) the registered
+        job, which is returned instead.
+
+        Raises ValueError if <job> is not merged and is already registered in another
+        JobRegistry, since a job holds the integer id of only one registry.
+        """
+        i = self._ids.get(str(job))
+        if i is not None:
+            if self.jobs[i] is not job:
+                self.duplicates += 1
+            return self.jobs[i]
+        if job.id is not None:
+            raise ValueError(f"<{str(job)}> is already registered in another JobRegistry!")
+
+        if self._free:
+            job.id = self._free.pop()
+            self.jobs[job.id] = job
+        else:
+            job.id = len(self.jobs)
+            self.jobs.append(job)
+        self._ids[str(job)] = job.id
+        return job
+
+    def remove(self, job: Job) -> None:
+        """
+        Unregisters <job>, freeing its integer id for the next job registered. <job> may
+        then be registered again, in this or another JobRegistry.
+
+        Every structure which stores the integer id of <job> must drop it first, since the
+        id may then be given to another job.
+
+        Raises ValueError if <job> is not registered in this JobRegistry.
+        """
+        if self.get(str(job)) is not job:
+            raise ValueError(f"<{str(job)}> is not registered in this JobRegistry!")
+
+        del self._ids[str(job)]
+        self.jobs[job.id] = None
+        self._free.append(job.id)
+        job.id = None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Returns the registered job with the job id <job_id>, or None if there is no such job.
+        """
+        i = self._ids.get(job_id)
+        return None if i is None else self.jobs[i]
+
+    def __getitem__(self, i: int) -> Job:
+        """
+        Returns the registered job with the integer id <i>.
+        """
+        return self.jobs[i]
+
+    def __contains__(self, job_id: str) -> bool:
+        """
+        Returns whether a job with the job id <job_id> is registered.
+        """
+        return job_id in self._ids
+
+    def __iter__(self) -> Iterator[Job]:
+        """
+        Returns an iterator over the registered jobs, in order of their integer id.
+        """
+        return (job for job in self.jobs if job is not None)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of registered jobs.
+        """
+        return len(self._ids)
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    # NOTES FOR PYTHON-TA:
+    python_ta.check_all(
+        config={
+            "max-line-length": 120,
+            "extra-imports": ["typing", "job"],
+        }
+    )
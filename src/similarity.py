@@ -0,0 +1,732 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the vectorized similarity engine of our application,
+which computes the similarity scores of many job postings at once using NumPy.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Optional
+from math import e, isqrt
+from heapq import heappush, heapreplace
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from src.job import Job
+from src.utility import (
+    SIMILARITY_WEIGHTS,
+    normalize_distance,
+    normalize_country,
+    normalize_rating,
+    normalize_skills,
+    normalize_pay,
+)
+from src.spatial import SpatialGrid
+
+# ====================================================================================
+# Feature Columns
+# ====================================================================================
+
+
+class JobArrays:
+    """
+    Class representing a sequence of jobs as column-oriented feature arrays, where
+    the i-th entry of every array describes self.jobs[i].
+
+    Instance Attributes:
+    - jobs: The jobs represented by these arrays, in order, or None if these arrays were
+    detached from their jobs.
+    - lat: The latitude of each job, in radians.
+    - lng: The longitude of each job, in radians.
+    - sin_lat: The sine of each job's latitude.
+    - cos_lat: The cosine of each job's latitude.
+    - country: An integer code for each job's country.
+    - rating: The rating of each job.
+    - pay: The annual pay of each job.
+    - skills: A (number of jobs) x (number of distinct skill characters) matrix, where
+    skills[i, s] == 1 if and only if character s occurs in job i's skills string (see
+    JobFeatures.skills). These are characters rather than skill names, matching
+    src.utility.normalize_skills.
+    - spatial: A spatial index used to skip the distance computation of far apart
+    jobs, or None if every distance is computed.
+    - profile: The weight profile used to combine the similarity components (see
+    SIMILARITY_COMPONENTS), or None to use DEFAULT_PROFILE.
+
+    Representation Invariants:
+    - all(len(arr) == len(self.pay) for arr in [self.lat, self.lng, self.country, self.rating])
+    - self.skills.shape[0] == len(self.pay)
+    - self.jobs is None or len(self.jobs) == len(self.pay)
+    """
+
+    jobs: Optional[list[Job]]
+    lat: np.ndarray
+    lng: np.ndarray
+    sin_lat: np.ndarray
+    cos_lat: np.ndarray
+    country: np.ndarray
+    rating: np.ndarray
+    pay: np.ndarray
+    skills: np.ndarray
+    spatial: Optional[SpatialGrid]
+    profile: Optional[dict[str, float]]
+
+    def __init__(self, jobs: list[Job]) -> None:
+        """
+        Initialize the feature arrays of <jobs>.
+        """
+        self.jobs = jobs
+        features = [job.features for job in jobs]
+
+        self.lat = np.array([f.lat for f in features], dtype=np.float64)
+        self.lng = np.array([f.lng for f in features], dtype=np.float64)
+        self.sin_lat = np.array([f.sin_lat for f in features], dtype=np.float64)
+        self.cos_lat = np.array([f.cos_lat for f in features], dtype=np.float64)
+        self.country = np.array([f.country_code for f in features], dtype=np.int32)
+        self.rating = np.array([job.rating for job in jobs], dtype=np.float64)
+        self.pay = np.array([f.annual_pay for f in features], dtype=np.float64)
+
+        vocabulary = {}
+        job_skills = [[vocabulary.setdefault(s, len(vocabulary)) for s in f.skills] for f in features]
+        self.skills = np.zeros((len(jobs), len(vocabulary)), dtype=np.float32)
+        for i, skill_ids in enumerate(job_skills):
+            self.skills[i, skill_ids] = 1
+        self.spatial = None
+        self.profile = None
+
+    def build_spatial_index(self, tolerance: float = 1e-3, cell_degrees: float = 5.0) -> None:
+        """
+        Builds a spatial index over these jobs, so that the distance similarity of jobs
+        which are too far apart for it to exceed <tolerance> is treated as 0 without
+        being computed.
+
+        Preconditions:
+        - 0 < tolerance < 1
+        - cell_degrees > 0
+        """
+        self.spatial = SpatialGrid(self.lat, self.lng, tolerance, cell_degrees)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of jobs represented by these arrays.
+        """
+        return len(self.pay)
+
+    def detached(self) -> JobArrays:
+        """
+        Returns a copy of these arrays without self.jobs, which is cheap to send to
+        worker processes. The feature arrays themselves are shared, not copied.
+        """
+        copy = object.__new__(JobArrays)
+        copy.__dict__.update(self.__dict__)
+        copy.jobs = None
+        return copy
+
+
+# ====================================================================================
+# Similarity Kernels
+# ====================================================================================
+
+
+def sigmoid(x: np.ndarray, scale_factor: Optional[int] = 1) -> np.ndarray:
+    """
+    Returns the value of f(x) = scale_factor/(1 + e^(-x)), applied elementwise.
+
+    This mirrors src.utility.sigmoid, except an overflow of e^(-x) evaluates to 0
+    rather than raising an error.
+    """
+    with np.errstate(over="ignore"):
+        return scale_factor / (1 + np.power(e, -x))
+
+
+def distance_kernel(arrays: JobArrays, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Returns the matrix of src.utility.normalize_distance values between the jobs at
+    indices <rows> and the jobs at indices <cols>.
+
+    If <arrays> has a spatial index, the values of pairs it prunes are 0.
+    """
+    if arrays.spatial is not None:
+        far = arrays.spatial.far_mask(rows, cols)
+        if far.any():
+            return _pruned_distance_kernel(arrays, rows, cols, far)
+
+    cosine_angular_distance = np.multiply.outer(arrays.sin_lat[rows], arrays.sin_lat[cols]) + (
+        np.multiply.outer(arrays.cos_lat[rows], arrays.cos_lat[cols])
+        * np.cos(np.subtract.outer(arrays.lng[rows], arrays.lng[cols]))
+    )
+    distance = np.arccos(np.clip(cosine_angular_distance, -1, 1)) * 6371
+    return sigmoid(-2 * distance / 1000.0, scale_factor=2)
+
+
+def _pruned_distance_kernel(
+    arrays: JobArrays, rows: np.ndarray, cols: np.ndarray, far: np.ndarray
+) -> np.ndarray:
+    """
+    Returns distance_kernel(<arrays>, <rows>, <cols>), except that the entries where <far>
+    is True are 0 and are not computed.
+    """
+    near_rows, near_cols = np.nonzero(~far)
+    i, j = rows[near_rows], cols[near_cols]
+    cosine_angular_distance = arrays.sin_lat[i] * arrays.sin_lat[j] + (
+        arrays.cos_lat[i] * arrays.cos_lat[j] * np.cos(arrays.lng[i] - arrays.lng[j])
+    )
+    distance = np.arccos(np.clip(cosine_angular_distance, -1, 1)) * 6371
+
+    normalized = np.zeros(far.shape)
+    normalized[near_rows, near_cols] = sigmoid(-2 * distance / 1000.0, scale_factor=2)
+    return normalized
+
+
+def country_kernel(arrays: JobArrays, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Returns the matrix of src.utility.normalize_country values between the jobs at
+    indices <rows> and the jobs at indices <cols>.
+    """
+    return np.where(np.equal.outer(arrays.country[rows], arrays.country[cols]), 0.8, 0.0)
+
+
+def rating_kernel(arrays: JobArrays, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Returns the matrix of src.utility.normalize_rating values between the jobs at
+    indices <rows> and the jobs at indices <cols>.
+    """
+    difference = np.abs(np.subtract.outer(arrays.rating[rows], arrays.rating[cols]))
+    return sigmoid(-0.6 * difference, scale_factor=2)
+
+
+def skills_kernel(arrays: JobArrays, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Returns the matrix of src.utility.normalize_skills values between the jobs at
+    indices <rows> and the jobs at indices <cols>.
+    """
+    num_intersecting = arrays.skills[rows] @ arrays.skills[cols].T
+    return sigmoid(num_intersecting.astype(np.float64) - 2)
+
+
+def pay_kernel(arrays: JobArrays, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    Returns the matrix of src.utility.normalize_pay values between the jobs at
+    indices <rows> and the jobs at indices <cols>.
+    """
+    var = np.abs(np.subtract.outer(arrays.pay[rows], arrays.pay[cols])) / 1000.0
+    return sigmoid(-0.75 * var, scale_factor=2)
+
+
+# ====================================================================================
+# Similarity Component Registry
+# ====================================================================================
+
+# A scalar similarity component, which returns a normalized value for a pair of jobs
+ScalarComponent = Callable[[Job, Job], float]
+
+# A vectorized similarity component, which returns the matrix of values of a scalar
+# component between the jobs at the given row and column indices
+ComponentKernel = Callable[[JobArrays, np.ndarray, np.ndarray], np.ndarray]
+
+# Every registered similarity component, mapped to its scalar reference implementation
+# and its vectorized kernel
+SIMILARITY_COMPONENTS: dict[str, tuple[ScalarComponent, ComponentKernel]] = {
+    "distance": (normalize_distance, distance_kernel),
+    "country": (normalize_country, country_kernel),
+    "rating": (normalize_rating, rating_kernel),
+    "skills": (normalize_skills, skills_kernel),
+    "pay": (normalize_pay, pay_kernel),
+}
+
+# The weight profile of src.utility.similarity_calculation
+DEFAULT_PROFILE = dict(zip(["distance", "country", "rating", "skills", "pay"], SIMILARITY_WEIGHTS))
+
+
+def register_component(name: str, scalar: ScalarComponent, kernel: ComponentKernel) -> None:
+    """
+    Registers a new similarity component called <name>, so that weight profiles may use it.
+
+    <scalar> computes the component for one pair of jobs, and <kernel> must compute the
+    same values for every pair of the given rows and columns at once. Both should be
+    module-level functions, so that they can be pickled: the components of a profile are
+    sent to every worker process along with the feature arrays (see _worker_initargs),
+    since a worker started with the "spawn" method does not share this registry.
+
+    Preconditions:
+    - name not in SIMILARITY_COMPONENTS
+    """
+    if name in SIMILARITY_COMPONENTS:
+        raise ValueError(f"A similarity component called <{name}> is already registered!")
+    SIMILARITY_COMPONENTS[name] = (scalar, kernel)
+
+
+def check_profile(profile: dict[str, float]) -> None:
+    """
+    Raises a ValueError if <profile> uses a similarity component which is not registered.
+    """
+    unknown = [name for name in profile if name not in SIMILARITY_COMPONENTS]
+    if unknown:
+        raise ValueError(f"Unknown similarity components: {unknown}")
+
+
+def scalar_similarity(job1: Job, job2: Job, profile: Optional[dict[str, float]] = None) -> float:
+    """
+    Returns the similarity score between <job1> and <job2> under the weight profile
+    <profile> (DEFAULT_PROFILE if None), using each component's scalar implementation.
+    """
+    profile = DEFAULT_PROFILE if profile is None else profile
+    check_profile(profile)
+
+    similarity = 0.0
+    for name, weight in profile.items():
+        similarity += SIMILARITY_COMPONENTS[name][0](job1, job2) * weight
+    return similarity
+
+
+def similarity_block(
+    arrays: JobArrays, rows: np.ndarray, cols: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Returns the matrix of scalar_similarity scores, under the weight profile of <arrays>,
+    between the jobs at indices <rows> and the jobs at indices <cols> (every job if <cols>
+    is None). Under DEFAULT_PROFILE, these are src.utility.similarity_calculation scores.
+
+    Entry [i, j] of the returned matrix is the similarity score of arrays.jobs[rows[i]]
+    and arrays.jobs[cols[j]]. Every weighted component kernel is accumulated into this one
+    matrix in a single pass, and components with a weight of 0 are skipped entirely.
+    """
+    if cols is None:
+        cols = np.arange(len(arrays))
+    profile = DEFAULT_PROFILE if arrays.profile is None else arrays.profile
+    check_profile(profile)
+
+    similarity = np.zeros((len(rows), len(cols)))
+    for name, weight in profile.items():
+        if weight != 0:
+            similarity += SIMILARITY_COMPONENTS[name][1](arrays, rows, cols) * weight
+
+    return similarity
+
+
+def similarity_matrix(arrays: JobArrays, block_size: Optional[int] = None) -> np.ndarray:
+    """
+    Returns the complete n x n matrix of similarity scores between every pair of jobs
+    in <arrays>, where n == len(arrays).
+
+    If <block_size> is not None, the matrix is filled in blocks of <block_size> rows, so
+    the kernels' temporaries only ever span one block rather than the whole matrix.
+
+    NOTE: The diagonal holds each job's similarity with itself, which is not an edge
+    of the weighted graph and should be ignored.
+
+    Preconditions:
+    - block_size is None or block_size > 0
+    """
+    n = len(arrays)
+    if block_size is None or block_size >= n:
+        return similarity_block(arrays, np.arange(n))
+
+    matrix = np.empty((n, n))
+    for start in range(0, n, block_size):
+        matrix[start:start + block_size] = similarity_block(arrays, np.arange(start, min(start + block_size, n)))
+    return matrix
+
+
+def top_k_neighbours(
+    arrays: JobArrays, k: int, block_size: Optional[int] = 1024
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a tuple (indices, scores) of two n x min(k, n - 1) matrices, where n == len(arrays),
+    such that row i holds the indices and similarity scores of the jobs most similar to
+    arrays.jobs[i] (excluding itself), sorted from highest to lowest score.
+
+    The similarity scores are computed in <block_size> x <block_size> tiles. After each
+    tile, only the <k> best candidates of each row are offered to that row's bounded
+    min-heap, so memory usage is O(n * k + block_size^2) rather than O(n^2).
+
+    Preconditions:
+    - k > 0
+    - block_size > 0
+    """
+    n = len(arrays)
+    blocks = [
+        _top_k_rows(arrays, row_start, min(row_start + block_size, n), k, block_size)
+        for row_start in range(0, n, block_size)
+    ]
+    return _stack_top_k(blocks, n, k)
+
+
+def _top_k_rows(
+    arrays: JobArrays, row_start: int, row_end: int, k: int, block_size: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the rows <row_start> to <row_end> - 1 of the (indices, scores) matrices
+    described in top_k_neighbours.
+    """
+    n = len(arrays)
+    rows = np.arange(row_start, row_end)
+    heaps = [[] for _ in rows]
+    for col_start in range(0, n, block_size):
+        cols = np.arange(col_start, min(col_start + block_size, n))
+        tile = similarity_block(arrays, rows, cols)
+        tile[np.equal.outer(rows, cols)] = -np.inf  # a job is not its own neighbour
+
+        num_candidates = min(k, len(cols))
+        candidates = np.argpartition(-tile, num_candidates - 1, axis=1)[:, :num_candidates]
+        for i, row_candidates in enumerate(candidates):
+            _offer(heaps[i], tile[i, row_candidates], cols[row_candidates], k)
+
+    k = min(k, n - 1)
+    indices = np.empty((len(rows), k), dtype=np.int64)
+    scores = np.empty((len(rows), k), dtype=np.float64)
+    for i, heap in enumerate(heaps):
+        heap.sort(reverse=True)
+        scores[i] = [score for score, _ in heap]
+        indices[i] = [index for _, index in heap]
+    return indices, scores
+
+
+def _stack_top_k(
+    blocks: list[tuple[np.ndarray, np.ndarray]], n: int, k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the (indices, scores) matrices of <n> jobs, stacked from the row <blocks>
+    returned by _top_k_rows.
+    """
+    if not blocks:
+        k = min(k, n - 1) if n > 0 else 0
+        return np.empty((n, k), dtype=np.int64), np.empty((n, k), dtype=np.float64)
+    return np.vstack([b[0] for b in blocks]), np.vstack([b[1] for b in blocks])
+
+
+def top_k_of_rows(block: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a tuple (positions, scores) of two len(block) x min(k, block.shape[1]) matrices,
+    where row i holds the column positions and values of the largest entries of block[i],
+    sorted from highest to lowest value.
+
+    Every row is handled in the same vectorized pass: one argpartition over the whole
+    block, followed by sorting only the <k> selected entries of each row.
+    """
+    k = min(k, block.shape[1])
+    if k == 0:
+        return np.empty((len(block), 0), dtype=np.int64), np.empty((len(block), 0))
+
+    positions = np.argpartition(-block, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(block, positions, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(positions, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def batch_top_k(
+    arrays: JobArrays,
+    rows: np.ndarray,
+    k: int,
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+    chunk_size: int = 256,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a tuple (indices, scores) of two len(rows) x min(k, n - 1) matrices, where
+    n == len(arrays), such that row i holds the indices and similarity scores of the jobs
+    most similar to arrays.jobs[rows[i]] (excluding itself), from highest to lowest score.
+
+    The queries are scored in chunks of <chunk_size> rows. If <workers> is not None, the
+    chunks are spread over <workers> threads, or processes if <use_processes> is True.
+
+    Preconditions:
+    - k > 0
+    - workers is None or workers > 0
+    - chunk_size > 0
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    tasks = [(rows[start:start + chunk_size], k) for start in range(0, len(rows), chunk_size)]
+    if workers is None:
+        blocks = [_batch_top_k_rows(arrays, chunk, k) for chunk, k in tasks]
+    elif use_processes:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=_worker_initargs(arrays)) as pool:
+            blocks = list(pool.map(_batch_top_k_task, tasks))
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            blocks = list(pool.map(lambda task: _batch_top_k_rows(arrays, *task), tasks))
+
+    if not blocks:
+        k = min(k, len(arrays) - 1) if len(arrays) > 0 else 0
+        return np.empty((0, k), dtype=np.int64), np.empty((0, k))
+    return np.vstack([b[0] for b in blocks]), np.vstack([b[1] for b in blocks])
+
+
+def _batch_top_k_rows(arrays: JobArrays, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the rows of the (indices, scores) matrices described in batch_top_k for the
+    query jobs at indices <rows>.
+    """
+    block = similarity_block(arrays, rows)
+    block[np.arange(len(rows)), rows] = -np.inf  # a job is not its own neighbour
+    return top_k_of_rows(block, min(k, len(arrays) - 1))
+
+
+# ====================================================================================
+# Memory Budget
+# ====================================================================================
+# Upper bounds on the bytes of working memory needed per entry of a similarity block,
+# covering the block itself and the temporaries of the kernels and top-k selection,
+# and per (score, index) entry of a row's bounded min-heap.
+_BLOCK_ENTRY_BYTES = 128
+_HEAP_ENTRY_BYTES = 128
+_MEMORY_UNITS = {"": 1, "B": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_memory_size(size: str) -> int:
+    """
+    Returns the number of bytes described by <size>: a number optionally followed by one
+    of the units B, K, M, G or T (powers of 1024), such as "2G", "512M" or "1.5g".
+
+    Raises ValueError if <size> is not of this form.
+    """
+    text = size.strip().upper().removesuffix("IB").removesuffix("B")
+    unit = text[-1:] if text[-1:] in _MEMORY_UNITS else ""
+    try:
+        amount = float(text[:len(text) - len(unit)])
+    except ValueError:
+        raise ValueError(f"Invalid memory size: {size!r}") from None
+    if amount <= 0:
+        raise ValueError(f"Invalid memory size: {size!r}")
+    return int(amount * _MEMORY_UNITS[unit])
+
+
+def block_size_for_memory(
+    n: int, k: Optional[int], max_memory: int, workers: Optional[int] = None
+) -> int:
+    """
+    Returns the largest block size with which the similarity scores of <n> jobs can be
+    built in at most <max_memory> bytes, serially if <workers> is None and by <workers>
+    processes (each holding one block at a time) otherwise.
+
+    If <k> is None, the scores are the complete n x n matrix of similarity_matrix, filled in
+    blocks of that many rows. Otherwise, they are the (indices, scores) matrices of
+    top_k_neighbours, computed in square tiles of that size, each reduced to per-row top-k
+    and discarded before the next one. In parallel, the blocks returned by the workers are
+    stacked into a copy, so the result is counted twice.
+
+    Raises ValueError if the result alone, or the result and a single row, do not fit.
+
+    Preconditions:
+    - n > 0
+    - k is None or k > 0
+    - workers is None or workers > 0
+    """
+    copies, in_flight = (1, 1) if workers is None else (2, workers)
+    if k is None:
+        available = (max_memory - copies * n * n * 8) // in_flight
+        size = available // (n * _BLOCK_ENTRY_BYTES)
+    else:
+        available = (max_memory - copies * n * min(k, n - 1) * 16) // in_flight
+        # The largest b such that _BLOCK_ENTRY_BYTES * b^2 + _HEAP_ENTRY_BYTES * k * b <= available
+        heap_bytes = _HEAP_ENTRY_BYTES * k
+        discriminant = heap_bytes * heap_bytes + 4 * _BLOCK_ENTRY_BYTES * max(available, 0)
+        size = (isqrt(discriminant) - heap_bytes) // (2 * _BLOCK_ENTRY_BYTES)
+
+    if available <= 0 or size < 1:
+        raise ValueError(f"Building the similarity scores of {n} jobs needs more than {max_memory} bytes!")
+    return min(size, n)
+
+
+# ====================================================================================
+# Quantized Storage
+# ====================================================================================
+# The dtypes in which edge weights may be stored, from most to least precise
+WEIGHT_DTYPES = ("float32", "float16", "uint8")
+
+
+def quantize_weights(weights: np.ndarray, dtype: str = "float32") -> tuple[np.ndarray, float, float]:
+    """
+    Returns a tuple (stored, scale, offset), where <stored> is <weights> quantized to <dtype>
+    (one of WEIGHT_DTYPES), such that stored * scale + offset approximates <weights>.
+
+    A uint8 weight is the nearest of 256 evenly spaced levels between the smallest and
+    largest of <weights>, while a float16 weight keeps about 3 significant digits. Either
+    way, quantizing never reverses the order of two weights, but may tie them.
+
+    Raises ValueError if <dtype> is not in WEIGHT_DTYPES.
+    """
+    if dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"Unknown weight dtype: {dtype!r}")
+    weights = np.asarray(weights)
+    if dtype != "uint8" or weights.size == 0:
+        return weights.astype(dtype), 1.0, 0.0
+
+    low, high = float(weights.min()), float(weights.max())
+    scale = (high - low) / 255 if high > low else 1.0
+    return np.rint((weights - low) / scale).astype(np.uint8), scale, low
+
+
+def dequantize_weights(stored: np.ndarray, scale: float, offset: float) -> np.ndarray:
+    """
+    Returns the approximate weights represented by the (<stored>, <scale>, <offset>)
+    returned by quantize_weights, as float64.
+    """
+    return stored.astype(np.float64) * scale + offset
+
+
+def quantization_report(
+    weights: np.ndarray, k: int = 15, dtypes: tuple[str, ...] = WEIGHT_DTYPES
+) -> list[dict[str, Any]]:
+    """
+    Returns, for each dtype in <dtypes>, how faithfully the weights of an n x m matrix
+    <weights> rank each row's <k> heaviest entries once quantized to that dtype.
+
+    Each result reports the bytes used per weight and in total, the average and minimum
+    fraction of each row's top <k> by full-precision weight that is also in its top <k> by
+    quantized weight (ties broken arbitrarily), and the largest absolute error of a weight.
+
+    NOTE: To report on a complete similarity matrix, drop its diagonal first, e.g. with
+    matrix[~np.eye(n, dtype=bool)].reshape(n, n - 1).
+
+    Preconditions:
+    - k > 0
+    - weights.ndim == 2 and weights.shape[1] > 0
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    expected = top_k_of_rows(weights, k)[0]
+    results = []
+    for dtype in dtypes:
+        stored, scale, offset = quantize_weights(weights, dtype)
+        approx = dequantize_weights(stored, scale, offset)
+        found = top_k_of_rows(approx, k)[0]
+        overlap = (expected[:, :, None] == found[:, None, :]).any(axis=2).mean(axis=1)
+        results.append({
+            "dtype": dtype,
+            "bytes_per_weight": stored.itemsize,
+            "nbytes": stored.nbytes,
+            "avg_overlap": float(overlap.mean()),
+            "min_overlap": float(overlap.min()),
+            "max_error": float(np.max(np.abs(approx - weights))),
+        })
+    return results
+
+
+# ====================================================================================
+# Parallel Construction
+# ====================================================================================
+
+# The feature arrays shared by every task of a worker process, set by _init_worker.
+_worker_arrays: Optional[JobArrays] = None
+
+
+def parallel_similarity_matrix(
+    arrays: JobArrays, workers: Optional[int] = None, chunk_size: int = 256
+) -> np.ndarray:
+    """
+    Returns the same matrix as similarity_matrix(<arrays>), computed in blocks of
+    <chunk_size> rows by <workers> processes (one per CPU if <workers> is None).
+
+    Preconditions:
+    - workers is None or workers > 0
+    - chunk_size > 0
+    """
+    n = len(arrays)
+    bounds = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=_worker_initargs(arrays)) as pool:
+        blocks = list(pool.map(_similarity_rows, bounds))
+    return np.vstack(blocks) if blocks else np.empty((0, 0))
+
+
+def parallel_top_k_neighbours(
+    arrays: JobArrays,
+    k: int,
+    workers: Optional[int] = None,
+    chunk_size: int = 256,
+    block_size: int = 1024,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the same (indices, scores) matrices as top_k_neighbours(<arrays>, <k>, <block_size>),
+    computed in blocks of <chunk_size> rows by <workers> processes (one per CPU if <workers>
+    is None).
+
+    Preconditions:
+    - k > 0
+    - workers is None or workers > 0
+    - chunk_size > 0
+    - block_size > 0
+    """
+    n = len(arrays)
+    tasks = [(start, min(start + chunk_size, n), k, block_size) for start in range(0, n, chunk_size)]
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=_worker_initargs(arrays)) as pool:
+        blocks = list(pool.map(_top_k_task, tasks))
+    return _stack_top_k(blocks, n, k)
+
+
+def _worker_initargs(arrays: JobArrays) -> tuple[JobArrays, dict[str, tuple[ScalarComponent, ComponentKernel]]]:
+    """
+    Returns the arguments of _init_worker for a worker process computing similarity
+    scores of <arrays>: the detached arrays, and every similarity component of their
+    weight profile, which may have been registered in this process only.
+    """
+    profile = DEFAULT_PROFILE if arrays.profile is None else arrays.profile
+    check_profile(profile)
+    return arrays.detached(), {name: SIMILARITY_COMPONENTS[name] for name in profile}
+
+
+def _init_worker(arrays: JobArrays, components: dict[str, tuple[ScalarComponent, ComponentKernel]]) -> None:
+    """
+    Stores <arrays> for every task later run by this worker process, after registering
+    any of the similarity <components> this process does not know about yet.
+    """
+    global _worker_arrays
+    for name, component in components.items():
+        SIMILARITY_COMPONENTS.setdefault(name, component)
+    _worker_arrays = arrays
+
+
+def _similarity_rows(bounds: tuple[int, int]) -> np.ndarray:
+    """
+    Returns the rows bounds[0] to bounds[1] - 1 of this worker's similarity matrix.
+    """
+    return similarity_block(_worker_arrays, np.arange(bounds[0], bounds[1]))
+
+
+def _top_k_task(task: tuple[int, int, int, int]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the rows task[0] to task[1] - 1 of this worker's top-task[2] neighbours,
+    computed in tiles of task[3] columns.
+    """
+    row_start, row_end, k, block_size = task
+    return _top_k_rows(_worker_arrays, row_start, row_end, k, block_size)
+
+
+def _batch_top_k_task(task: tuple[np.ndarray, int]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns _batch_top_k_rows of this worker's arrays for the query rows task[0] and k = task[1].
+    """
+    return _batch_top_k_rows(_worker_arrays, task[0], task[1])
+
+
+def _offer(heap: list[tuple[float, int]], scores: np.ndarray, indices: np.ndarray, k: int) -> None:
+    """
+    Offers each (scores[i], indices[i]) candidate to <heap>, a min-heap which keeps
+    only the <k> highest scoring candidates it has been offered.
+    """
+    for score, index in zip(scores.tolist(), indices.tolist()):
+        if score == -np.inf:
+            continue
+        elif len(heap) < k:
+            heappush(heap, (score, index))
+        elif (score, index) > heap[0]:
+            heapreplace(heap, (score, index))
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    # NOTES FOR PYTHON-TA:
+    python_ta.check_all(
+        config={
+            "max-line-length": 120,
+            "extra-imports": ["typing", "math", "heapq", "concurrent.futures", "numpy", "job", "utility", "spatial"],
+        }
+    )
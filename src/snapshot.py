@@ -0,0 +1,146 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the binary snapshot format of our application, which
+stores named arrays in a single file so that they can be memory-mapped back
+without parsing or copying them.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from typing import Any
+from pathlib import Path
+import json
+import os
+import numpy as np
+
+# The first bytes of every snapshot file
+SNAPSHOT_MAGIC = b"CCSNAP\x00\x00"
+
+# Bump this whenever the snapshot layout changes, so that older snapshots are rejected
+SNAPSHOT_VERSION = 3
+
+# The alignment in bytes of every array section, so each can be viewed in place
+_ALIGNMENT = 64
+
+
+def pack_strings(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a tuple (blob, offsets) packing <strings> into a string table, where <blob>
+    holds every string encoded in UTF-8, back to back, and strings[i] is
+    blob[offsets[i]:offsets[i + 1]].
+    """
+    return pack_bytes([string.encode("utf-8") for string in strings])
+
+
+def unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> list[str]:
+    """
+    Returns the strings packed into the string table (<blob>, <offsets>) by pack_strings.
+    """
+    return [data.decode("utf-8") for data in unpack_bytes(blob, offsets)]
+
+
+def pack_bytes(chunks: list[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a tuple (blob, offsets) packing <chunks> like pack_strings, where <blob>
+    holds every chunk back to back, and chunks[i] is blob[offsets[i]:offsets[i + 1]].
+    """
+    offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in chunks], out=offsets[1:])
+    return np.frombuffer(b"".join(chunks), dtype=np.uint8), offsets
+
+
+def unpack_bytes(blob: np.ndarray, offsets: np.ndarray) -> list[bytes]:
+    """
+    Returns the chunks packed into (<blob>, <offsets>) by pack_bytes.
+    """
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+
+def write_snapshot(file: str, sections: dict[str, np.ndarray], meta: dict[str, Any]) -> None:
+    """
+    Writes a snapshot of the arrays <sections> and the JSON-serializable <meta> to <file>.
+
+    The file starts with SNAPSHOT_MAGIC, then the version and the length of a JSON header
+    (as little-endian uint32s), then the header, which describes the dtype, shape and
+    offset of each array section. Each section is aligned to _ALIGNMENT bytes.
+
+    <file> is only replaced once the whole snapshot has been written next to it, so if
+    saving is interrupted, any previous snapshot at <file> is still there to load.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in sections.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+    header = json.dumps({"sections": layout, "meta": meta}).encode("utf-8")
+    preamble = SNAPSHOT_MAGIC + np.array([SNAPSHOT_VERSION, len(header)], dtype="<u4").tobytes() + header
+    start = -(-len(preamble) // _ALIGNMENT) * _ALIGNMENT
+
+    path = Path(file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as snapshot:
+        snapshot.write(preamble.ljust(start, b"\x00"))
+        for name, array in arrays.items():
+            snapshot.seek(start + layout[name]["offset"])
+            snapshot.write(array.tobytes())
+        snapshot.truncate(start + offset)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(file: str) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+    """
+    Returns a tuple (sections, meta) of the arrays and metadata written to <file> by
+    write_snapshot. Every array is a read-only view of one memory map of <file>, so no
+    section is read or copied until it is used.
+
+    Raises ValueError if <file> is not a snapshot of the current SNAPSHOT_VERSION.
+    """
+    with open(file, "rb") as snapshot:
+        preamble = snapshot.read(len(SNAPSHOT_MAGIC) + 8)
+        if len(preamble) < len(SNAPSHOT_MAGIC) + 8 or not preamble.startswith(SNAPSHOT_MAGIC):
+            raise ValueError(f"{file} is not a CareerCompass snapshot!")
+        version, header_length = np.frombuffer(preamble[len(SNAPSHOT_MAGIC):], dtype="<u4").tolist()
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"{file} is a version {version} snapshot, expected version {SNAPSHOT_VERSION}!")
+        header = json.loads(snapshot.read(header_length).decode("utf-8"))
+
+    start = -(-(len(preamble) + header_length) // _ALIGNMENT) * _ALIGNMENT
+    mapped = np.memmap(file, dtype=np.uint8, mode="r") if os.path.getsize(file) > start else None
+    sections = {}
+    for name, section in header["sections"].items():
+        dtype, shape = np.dtype(section["dtype"]), tuple(section["shape"])
+        size = int(np.prod(shape)) * dtype.itemsize
+        if size == 0:
+            sections[name] = np.empty(shape, dtype=dtype)
+        else:
+            begin = start + section["offset"]
+            sections[name] = mapped[begin:begin + size].view(dtype).reshape(shape)
+    return sections, header["meta"]
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    # NOTES FOR PYTHON-TA:
+    # 1. E9998 (Forbidden-IO-Function): Necessary for reading and writing our snapshot files
+    python_ta.check_all(
+        config={
+            "max-line-length": 120,
+            "extra-imports": ["typing", "pathlib", "json", "os", "numpy"],
+            "disable": ["E9998"],
+        }
+    )
@@ -0,0 +1,143 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the spatial index of our application, which lets the
+similarity engine skip the distance computation for job postings that are too far
+apart for their distance similarity to matter.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from math import log
+import numpy as np
+
+
+def cutoff_distance(tolerance: float) -> float:
+    """
+    Returns the distance in km past which src.utility.normalize_distance is at most <tolerance>.
+
+    The normalized distance is f(d) = 2/(1 + e^(2d/1000)), so f(d) <= tolerance if and
+    only if d >= 500 * ln(2/tolerance - 1).
+
+    Preconditions:
+    - 0 < tolerance < 1
+    """
+    return 500 * log(2 / tolerance - 1)
+
+
+def _great_circle_distance(
+    lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray
+) -> np.ndarray:
+    """
+    Returns the elementwise distance in km between the coordinates (<lat1>, <lng1>) and
+    (<lat2>, <lng2>), given in radians, using the same formula as src.utility.calculate_distance.
+    """
+    cosine_angular_distance = np.sin(lat1) * np.sin(lat2) + np.cos(lat1) * np.cos(lat2) * np.cos(lng2 - lng1)
+    return np.arccos(np.clip(cosine_angular_distance, -1, 1)) * 6371
+
+
+class SpatialGrid:
+    """
+    Class representing a grid index over job coordinates, which splits the globe into
+    cells of <cell_degrees> x <cell_degrees> degrees of latitude and longitude.
+
+    For every pair of occupied cells, the grid stores a lower bound on the distance between
+    any two points of those cells. Two jobs whose cells are at least self.cutoff km apart
+    have a distance similarity of at most self.tolerance, which is treated as 0.
+
+    Instance Attributes:
+    - tolerance: The largest distance similarity which may be treated as 0.
+    - cutoff: The distance in km past which a pair of jobs is pruned.
+    - cells: The index of the occupied cell of each job.
+    - far: A matrix where far[a, b] is True if and only if every pair of points in
+    occupied cells a and b is at least self.cutoff km apart.
+    - stats: The number of pairs checked and pruned by far_mask so far, in this process
+    only. Use count_pruned_pairs for the pairs pruned across every worker process.
+
+    Representation Invariants:
+    - 0 < self.tolerance < 1
+    - self.far.shape[0] == self.far.shape[1]
+    - all(0 <= c < self.far.shape[0] for c in self.cells)
+    """
+
+    tolerance: float
+    cutoff: float
+    cells: np.ndarray
+    far: np.ndarray
+    stats: dict[str, int]
+
+    def __init__(self, lat: np.ndarray, lng: np.ndarray, tolerance: float = 1e-3,
+                 cell_degrees: float = 5.0) -> None:
+        """
+        Initialize a SpatialGrid over jobs at latitudes <lat> and longitudes <lng>, given in radians.
+
+        Preconditions:
+        - len(lat) == len(lng)
+        - 0 < tolerance < 1
+        - cell_degrees > 0
+        """
+        self.tolerance = tolerance
+        self.cutoff = cutoff_distance(tolerance)
+        self.stats = {"pairs": 0, "pruned": 0}
+
+        num_lat_cells = int(np.ceil(180 / cell_degrees))
+        num_lng_cells = int(np.ceil(360 / cell_degrees))
+        lat_cells = np.clip(((np.degrees(lat) + 90) // cell_degrees).astype(np.int64), 0, num_lat_cells - 1)
+        lng_cells = np.clip(((np.degrees(lng) + 180) // cell_degrees).astype(np.int64), 0, num_lng_cells - 1)
+        occupied, self.cells = np.unique(lat_cells * num_lng_cells + lng_cells, return_inverse=True)
+        self.cells = self.cells.reshape(-1)
+
+        # The bounds of each occupied cell, in radians
+        south = np.radians((occupied // num_lng_cells) * cell_degrees - 90)
+        west = np.radians((occupied % num_lng_cells) * cell_degrees - 180)
+        size = np.radians(cell_degrees)
+        centre_lat, centre_lng = south + size / 2, west + size / 2
+
+        # The farthest point of a latitude/longitude cell from its centre is one of its corners
+        radius = np.max(
+            [_great_circle_distance(centre_lat, centre_lng, south + dlat, west + dlng)
+             for dlat in (0, size) for dlng in (0, size)],
+            axis=0,
+        ) * 1.001 + 1
+
+        centre_distance = _great_circle_distance(
+            centre_lat[:, None], centre_lng[:, None], centre_lat[None, :], centre_lng[None, :]
+        )
+        self.far = centre_distance - radius[:, None] - radius[None, :] >= self.cutoff
+
+    def far_mask(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Returns a matrix whose entry [i, j] is True if and only if the jobs at indices
+        rows[i] and cols[j] are guaranteed to be at least self.cutoff km apart.
+        """
+        mask = self.far[np.ix_(self.cells[rows], self.cells[cols])]
+        self.stats["pairs"] += mask.size
+        self.stats["pruned"] += int(np.count_nonzero(mask))
+        return mask
+
+    def count_pruned_pairs(self) -> int:
+        """
+        Returns the number of ordered pairs of jobs in this grid which are pruned.
+        """
+        counts = np.bincount(self.cells, minlength=self.far.shape[0]).astype(np.int64)
+        return int(counts @ self.far.astype(np.int64) @ counts)
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    # NOTES FOR PYTHON-TA:
+    python_ta.check_all(
+        config={
+            "max-line-length": 120,
+            "extra-imports": ["math", "numpy"],
+        }
+    )
@@ -16,10 +16,35 @@ This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi
 """
 
 from __future__ import annotations
-from typing import Optional
+from typing import Any, Callable, Iterator, Optional
 from random import sample
-from src.utility import similarity_calculation, load_jobs_csv
-from src.job import Job
+from heapq import nlargest
+from itertools import islice
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import time
+import numpy as np
+from src.utility import similarity_calculation, load_job_registry
+from src.similarity import (
+    JobArrays,
+    similarity_block,
+    similarity_matrix,
+    top_k_neighbours,
+    parallel_similarity_matrix,
+    parallel_top_k_neighbours,
+    scalar_similarity,
+    check_profile,
+    top_k_of_rows,
+    batch_top_k,
+    block_size_for_memory,
+    quantize_weights,
+    dequantize_weights,
+)
+from src.cache import cache_key, profile_tag, load_cached, save_cached
+from src.snapshot import pack_strings, unpack_strings, pack_bytes, unpack_bytes, write_snapshot, read_snapshot
+from src.lsh import MinHashIndex
+from src.job import NUM_DECISIONS, Job
+from src.registry import JobRegistry
 
 
 # ====================================================================================
@@ -34,14 +59,20 @@ class _WeightedVertex:
     Instance Attributes:
     - item: The Job instance this weighted vertex represents.
     - neighbours: The vertices adjacent to this vertex, and their corresponding edge's weight.
+    - referrers: In a sparse top-k graph, the vertices which keep this vertex as a neighbour.
+    - ranked: The jobs of this vertex's most similar neighbours, from highest to lowest
+    similarity score, or None if they have not been ranked since the neighbours last changed.
 
     Preconditions:
     - self not in self.neighbours
-    - all([self in u.neighbours for u in self.neighbours])
+    - all([self in u.neighbours for u in self.neighbours]), unless this vertex belongs
+      to a sparse top-k graph, in which case each vertex only keeps its own top-k neighbours
     """
 
     item: Job
     neighbours: dict[_WeightedVertex, float]
+    referrers: set[_WeightedVertex]
+    ranked: Optional[list[Job]]
 
     def __init__(self, item: Job) -> None:
         """
@@ -49,6 +80,8 @@ class _WeightedVertex:
         """
         self.item = item
         self.neighbours = {}
+        self.referrers = set()
+        self.ranked = None
 
     def calculate_similarity(self, other: _WeightedVertex) -> float:
         """
@@ -62,20 +95,67 @@ class WeightedGraph:
     Class representing a weighted graph used to represent each job posting and their similarity
     score to the other job postings.
 
+    Instance Attributes:
+    - pruned_pairs: The number of ordered pairs of jobs whose distance computation was
+    pruned by a spatial index when this graph was built by load_graph_and_tree, or None
+    if it was built without one.
+
     Private Instance Attributes:
     - _vertices: The Job vertices in this graph.
+    - _top_k: The maximum number of neighbours kept per vertex, or None if this graph is complete.
+    - _profile: The weight profile of the similarity scores, or None for the default weights.
+    - _rank_depth: The depth of the last call to rank_neighbours, or None if it has not
+    been called.
+    - _short: In a sparse graph, the vertices which lost a neighbour to remove_job, and so
+    keep fewer than their top-k neighbours until add_jobs recomputes them.
 
     Representation Invariants:
     - all(job == self._vertices[job].job for job in self._vertices)
+    - self._top_k is None or all(len(v.neighbours) <= self._top_k for v in self._vertices.values())
     """
 
+    pruned_pairs: Optional[int]
     _vertices: dict[Job, _WeightedVertex]
+    _top_k: Optional[int]
+    _profile: Optional[dict[str, float]]
+    _rank_depth: Optional[int]
+    _short: set[_WeightedVertex]
 
-    def __init__(self) -> None:
+    def __init__(self, top_k: Optional[int] = None, profile: Optional[dict[str, float]] = None) -> None:
         """
-        Initializes a WeightedGraph instance.
+        Initializes a WeightedGraph instance, whose similarity scores use the weight
+        profile <profile> (see src.similarity), or the default weights if it is None.
+
+        If <top_k> is not None, this graph is sparse: each vertex only keeps edges to the
+        <top_k> jobs most similar to it (see set_neighbours), so memory grows as O(n * top_k)
+        rather than O(n^2).
+
+        Preconditions:
+        - top_k is None or top_k > 0
         """
         self._vertices = {}
+        self._top_k = top_k
+        self._profile = profile
+        self._rank_depth = None
+        self._short = set()
+        self.pruned_pairs = None
+
+    @property
+    def profile(self) -> Optional[dict[str, float]]:
+        """
+        Returns the weight profile of the similarity scores of this graph, or None if it
+        uses the default weights.
+        """
+        return self._profile
+
+    def _score(self, job1: Job, job2: Job) -> float:
+        """
+        Returns the similarity score between <job1> and <job2> under self._profile,
+        computed on its own.
+        """
+        if self._profile is None:
+            return similarity_calculation(job1, job2)
+        return scalar_similarity(job1, job2, self._profile)
 
     def add_vertex(self, job: Job) -> None:
         """
@@ -94,22 +174,215 @@ class WeightedGraph:
             )
         else:
             v1, v2 = self._vertices[job1], self._vertices[job2]
-            assert v1.calculate_similarity(v2) == v2.calculate_similarity(v1)
+            similarity = self._score(job1, job2)
+            v1.neighbours[v2], v2.neighbours[v1] = similarity, similarity
+            self._rank_new_neighbour(v1, v2, similarity)
+            self._rank_new_neighbour(v2, v1, similarity)
+
+    def add_weighted_edges(self, job: Job, others: list[Job], weights: list[float]) -> None:
+        """
+        Adds an edge between <job> and each job in <others>, where the edge between
+        <job> and others[i] has the precomputed similarity score weights[i].
+
+        Preconditions:
+        - len(others) == len(weights)
+        - job not in others
+        """
+        if job not in self._vertices or any(other not in self._vertices for other in others):
+            raise ValueError(f"<{str(job)}> or one of <others> is not a vertex in this graph!")
 
-            similarity = v1.calculate_similarity(v2)
+        v1 = self._vertices[job]
+        v1.ranked = None
+        for other, similarity in zip(others, weights):
+            v2 = self._vertices[other]
             v1.neighbours[v2], v2.neighbours[v1] = similarity, similarity
+            self._rank_new_neighbour(v2, v1, similarity)
+
+    def set_neighbours(self, job: Job, neighbours: list[tuple[Job, float]]) -> None:
+        """
+        Replaces the neighbours of <job> with <neighbours>, a list of (job, similarity score)
+        pairs. Unlike add_edge, the edges are only stored on <job>'s vertex.
+
+        This is used to build sparse top-k graphs, where <job> being one of the most
+        similar jobs to another job does not make the reverse true.
+
+        Preconditions:
+        - self._top_k is None or len(neighbours) <= self._top_k
+        - all(other != job for other, _ in neighbours)
+        """
+        if job not in self._vertices or any(other not in self._vertices for other, _ in neighbours):
+            raise ValueError(f"<{str(job)}> or one of its neighbours is not a vertex in this graph!")
+
+        v = self._vertices[job]
+        for u in v.neighbours:
+            u.referrers.discard(v)
+        v.neighbours = {self._vertices[other]: similarity for other, similarity in neighbours}
+        v.ranked = None
+        for u in v.neighbours:
+            u.referrers.add(v)
+
+    def add_jobs(self, jobs: list[Job]) -> None:
+        """
+        Adds every job in <jobs> to this weighted graph instance, computing only the
+        similarity scores between the new jobs and every job in the graph.
+
+        In a sparse graph, the new jobs also replace the weakest neighbours of the
+        existing vertices they are more similar to, and the neighbours of every vertex
+        which lost a neighbour to remove_job are recomputed against every job in the graph.
+
+        Preconditions:
+        - all(job not in self._vertices for job in jobs)
+        """
+        existing = list(self._vertices)
+        for job in jobs:
+            self.add_vertex(job)
+        everything = existing + jobs
+        arrays = JobArrays(everything)
+        arrays.profile = self._profile
+        new_rows = np.arange(len(existing), len(everything))
+        block = similarity_block(arrays, new_rows)
+
+        if self._top_k is None:
+            for i, job in enumerate(jobs):
+                later = len(existing) + i + 1
+                weights = np.concatenate([block[i, :len(existing)], block[i, later:]])
+                self.add_weighted_edges(job, existing + jobs[i + 1:], weights.tolist())
+            return
+
+        block[np.arange(len(jobs)), new_rows] = -np.inf  # a job is not its own neighbour
+        k = min(self._top_k, len(everything) - 1)
+        for i, job in enumerate(jobs):
+            best = np.argsort(-block[i], kind="stable")[:k].tolist()
+            self.set_neighbours(job, [(everything[j], float(block[i, j])) for j in best])
+
+        short_rows = []
+        for j, job in enumerate(existing):
+            v = self._vertices[job]
+            if v in self._short:
+                short_rows.append(j)
+                continue
+            for i in np.flatnonzero(block[:, j] > self._weakest_similarity(v)).tolist():
+                self._offer_neighbour(v, self._vertices[jobs[i]], float(block[i, j]))
+
+        # A vertex which lost a neighbour does not know its next most similar job, so its
+        # neighbours are recomputed rather than topped up with whichever new job comes along
+        if short_rows and k > 0:
+            indices, scores = batch_top_k(arrays, np.array(short_rows), k)
+            for j, row, weights in zip(short_rows, indices.tolist(), scores.tolist()):
+                self.set_neighbours(existing[j], [(everything[i], w) for i, w in zip(row, weights)])
+        self._short.clear()
+
+    def remove_job(self, job: Job) -> None:
+        """
+        Removes <job> and its edges from this weighted graph instance in O(degree) time.
+
+        NOTE: In a sparse graph, the vertices which kept <job> as a neighbour are left with
+        one fewer neighbour, i.e., only the rest of their top-k neighbours, until the next
+        call to add_jobs recomputes them (which update_graph_and_tree always makes).
+        """
+        if job not in self._vertices:
+            raise ValueError("Job does not exist in this <WeightedGraph> instance!")
+
+        v = self._vertices.pop(job)
+        for u in v.neighbours:
+            self._unrank_neighbour(u, v)
+            u.neighbours.pop(v, None)
+            u.referrers.discard(v)
+        for u in v.referrers:
+            self._unrank_neighbour(u, v)
+            u.neighbours.pop(v, None)
+        if self._top_k is not None:
+            self._short.update(v.referrers)
+            self._short.discard(v)
+
+    def _weakest_similarity(self, v: _WeightedVertex) -> float:
+        """
+        Returns the similarity score a job must beat to become a neighbour of <v> in
+        this sparse graph.
+        """
+        if len(v.neighbours) < self._top_k:
+            return -np.inf
+        return min(v.neighbours.values())
+
+    def _offer_neighbour(self, v: _WeightedVertex, u: _WeightedVertex, similarity: float) -> None:
+        """
+        Makes <u> a neighbour of <v> in this sparse graph, evicting <v>'s weakest
+        neighbour if <v> already has self._top_k neighbours.
+        """
+        if len(v.neighbours) >= self._top_k:
+            weakest = min(v.neighbours, key=v.neighbours.get)
+            if v.neighbours[weakest] >= similarity:
+                return
+            self._unrank_neighbour(v, weakest)
+            del v.neighbours[weakest]
+            weakest.referrers.discard(v)
+        v.neighbours[u] = similarity
+        self._rank_new_neighbour(v, u, similarity)
+        u.referrers.add(v)
+
+    def _rank_new_neighbour(self, v: _WeightedVertex, u: _WeightedVertex, similarity: float) -> None:
+        """
+        Keeps v.ranked valid now that <u> was just added as a neighbour of <v> with the
+        weight <similarity>, in O(len(v.ranked)) time.
+
+        If v.ranked held every other neighbour of <v>, <u> is inserted into it. Otherwise,
+        <u> is only inserted if it beats the last ranked neighbour, which it replaces. If <u>
+        was already ranked, its weight may have changed, so v.ranked is discarded.
+        """
+        ranked = v.ranked
+        if ranked is None:
+            return
+        elif u.item in ranked:
+            v.ranked = None
+            return
+        complete = len(ranked) == len(v.neighbours) - 1
+        i = len(ranked)
+        for j, other in enumerate(ranked):
+            if v.neighbours[self._vertices[other]] < similarity:
+                i = j
+                break
+        if complete:
+            ranked.insert(i, u.item)
+        elif i < len(ranked):
+            ranked.insert(i, u.item)
+            ranked.pop()
+
+    def _unrank_neighbour(self, v: _WeightedVertex, u: _WeightedVertex) -> None:
+        """
+        Keeps v.ranked valid now that <u> is about to stop being a neighbour of <v>.
+
+        A neighbour outside v.ranked does not change it. A ranked neighbour is removed from
+        it if v.ranked holds every neighbour of <v>, and otherwise v.ranked is discarded,
+        since the next neighbour to rank is unknown (see rerank_neighbours).
+        """
+        if v.ranked is None or u not in v.neighbours or u.item not in v.ranked:
+            return
+        if len(v.ranked) == len(v.neighbours):
+            v.ranked.remove(u.item)
+        else:
+            v.ranked = None
 
     def get_similarity(self, job1: Job, job2: Job) -> float:
         """
         Returns the similarity score between job1 and job2.
 
+        If this graph is sparse and neither job kept the other as a neighbour, the
+        similarity score is computed on demand.
+
         Precondititions:
         - job1 != job2
         """
         v1 = self._vertices[job1]
         v2 = self._vertices[job2]
 
-        return v1.neighbours.get(v2, 0)
+        if v2 in v1.neighbours:
+            return v1.neighbours[v2]
+        elif self._top_k is None:
+            return 0
+        elif v1 in v2.neighbours:
+            return v2.neighbours[v1]
+        else:
+            return self._score(job1, job2)
 
     def get_similar_jobs(
         self, job: Job, limit: Optional[int] = 5, offset: Optional[int] = 10
@@ -119,6 +392,13 @@ class WeightedGraph:
 
         The <offset>  offset introduced to introduce a 'random'
         aspect to the <limit> similar jobs retrieved.
+
+        If <job>'s neighbours have been ranked deeply enough by rank_neighbours, this only
+        takes O(limit) time. Otherwise, every neighbour of <job> is sorted.
+
+        NOTE: In a sparse graph, only the top-k neighbours of <job> are candidates,
+        so top_k should be at least <limit> + 10. If <job> has fewer than <limit>
+        neighbours, all of them are returned.
         """
         if (offset + limit) > len(self):
             raise ValueError("Limit / Offset are too high!")
@@ -126,6 +406,10 @@ class WeightedGraph:
             raise ValueError("Job does not exist in this <WeightedGraph> instance!")
 
         job_vertex = self._vertices[job]
+        ranked = job_vertex.ranked
+        if ranked is not None and (len(ranked) >= limit + 10 or len(ranked) == len(job_vertex.neighbours)):
+            return sample(ranked[: limit + 10], min(limit, len(ranked)))
+
         sorted_jobs = sorted(
             job_vertex.neighbours.items(), key=lambda item: item[1], reverse=True
         )
@@ -134,7 +418,117 @@ class WeightedGraph:
             neighbour_vertex.item for neighbour_vertex, _ in sorted_jobs[: limit + 10]
         ]
 
-        return sample(similar_jobs, limit)
+        return sample(similar_jobs, min(limit, len(similar_jobs)))
+
+    def rank_neighbours(self, depth: int = 15, chunk_size: int = 1024) -> None:
+        """
+        Ranks the <depth> most similar neighbours of every vertex in this graph ahead of time,
+        so that get_similar_jobs with <limit> + 10 <= <depth> is a slice of a ranked list.
+
+        The vertices are ranked <chunk_size> at a time with get_similar_jobs_batch. A vertex's
+        ranking is kept up to date as edges are added, and is only discarded when one of
+        its ranked neighbours is removed (see rerank_neighbours).
+
+        Preconditions:
+        - depth > 0
+        - chunk_size > 0
+        """
+        self._rank_depth = depth
+        self._rank_vertices(list(self._vertices), depth, chunk_size)
+
+    def rerank_neighbours(self, chunk_size: int = 1024) -> None:
+        """
+        Ranks the neighbours of every vertex without a ranking, such as new vertices, to the
+        depth of the last call to rank_neighbours. Does nothing if it has not been called.
+
+        Preconditions:
+        - chunk_size > 0
+        """
+        if self._rank_depth is not None:
+            jobs = [job for job, v in self._vertices.items() if v.ranked is None]
+            self._rank_vertices(jobs, self._rank_depth, chunk_size)
+
+    def _rank_vertices(self, jobs: list[Job], depth: int, chunk_size: int) -> None:
+        """
+        Ranks the <depth> most similar neighbours of the vertex of every job in <jobs>,
+        <chunk_size> vertices at a time.
+        """
+        for start in range(0, len(jobs), chunk_size):
+            chunk = jobs[start:start + chunk_size]
+            for job, ranked in zip(chunk, self.get_similar_jobs_batch(chunk, depth)):
+                self._vertices[job].ranked = ranked
+
+    def get_similar_jobs_batch(
+        self, jobs: list[Job], k: int = 15, workers: Optional[int] = None, use_processes: bool = False
+    ) -> list[list[Job]]:
+        """
+        Returns, for each job in <jobs>, the (at most) <k> jobs with the highest similarity
+        score to it, from highest to lowest score.
+
+        The neighbour weights of every query are gathered into one matrix, and the top <k>
+        of every row are selected in a single vectorized pass. If <workers> is not None, the
+        queries are split into chunks handled by <workers> threads. <use_processes> is only
+        supported by graphs which compute their scores with the similarity engine.
+
+        Preconditions:
+        - all(job in self for job in jobs)
+        - k > 0
+        """
+        if any(job not in self for job in jobs):
+            raise ValueError("Job does not exist in this <WeightedGraph> instance!")
+        elif use_processes:
+            raise ValueError("This <WeightedGraph> instance does not support process parallelism!")
+
+        if workers is None:
+            return self._top_k_chunk(jobs, k)
+
+        chunk_size = max(1, -(-len(jobs) // workers))
+        chunks = [jobs[start:start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+        with ThreadPoolExecutor(workers) as pool:
+            results = list(pool.map(lambda chunk: self._top_k_chunk(chunk, k), chunks))
+        return [similar for chunk_result in results for similar in chunk_result]
+
+    def _top_k_chunk(self, jobs: list[Job], k: int) -> list[list[Job]]:
+        """
+        Returns get_similar_jobs_batch(<jobs>, <k>) computed without any parallelism.
+        """
+        rows = [self._neighbour_row(job) for job in jobs]
+        width = max((len(weights) for _, weights in rows), default=0)
+        block = np.full((len(rows), width), -np.inf)
+        for i, (_, weights) in enumerate(rows):
+            block[i, :len(weights)] = weights
+
+        positions, scores = top_k_of_rows(block, k)
+        return [
+            [rows[i][0][p] for p, score in zip(positions[i].tolist(), scores[i].tolist()) if score != -np.inf]
+            for i in range(len(rows))
+        ]
+
+    def _neighbour_row(self, job: Job) -> tuple[list[Job], np.ndarray]:
+        """
+        Returns the neighbours of <job> and the weights of their edges to <job>, in the same order.
+        """
+        v = self._vertices[job]
+        neighbours = [u.item for u in v.neighbours]
+        return neighbours, np.fromiter(v.neighbours.values(), dtype=np.float64, count=len(neighbours))
+
+    def csr_arrays(self) -> tuple[list[Job], np.ndarray, np.ndarray, np.ndarray, float, float]:
+        """
+        Returns a tuple (jobs, indptr, neighbour_ids, weights, scale, offset) of the
+        arguments which build a <CSRWeightedGraph> equal to this graph, with float32 weights
+        and each row sorted from highest to lowest weight.
+        """
+        jobs = list(self._vertices)
+        ids = {job: i for i, job in enumerate(jobs)}
+        rows = [
+            sorted(self._vertices[job].neighbours.items(), key=lambda item: item[1], reverse=True)
+            for job in jobs
+        ]
+        indptr = np.zeros(len(jobs) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        neighbour_ids = np.array([ids[u.item] for row in rows for u, _ in row], dtype=np.int32)
+        weights = np.array([weight for row in rows for _, weight in row], dtype=np.float32)
+        return jobs, indptr, neighbour_ids, weights, 1.0, 0.0
 
     def get_vertices(self) -> dict[Job, _WeightedVertex]:
         """
@@ -152,6 +546,12 @@ class WeightedGraph:
             total += job.get_annual_pay()
         return int(total / len(self))
 
+    def __contains__(self, job: Job) -> bool:
+        """
+        Returns whether <job> is a vertex in this WeightedGraph instance.
+        """
+        return job in self._vertices
+
     def __len__(self) -> int:
         """
         Returns the length of this WeightedGraph instance.
@@ -159,119 +559,1386 @@ class WeightedGraph:
         return len(self._vertices)
 
 
-# ====================================================================================
-# Decision Tree
-# ====================================================================================
+class LazyWeightedGraph(WeightedGraph):
+    """
+    Class representing a weighted graph whose edges are computed on demand.
 
+    Adding a vertex does no similarity work. The first time the neighbours of a job
+    are needed, its entire row of similarity scores is computed at once and stored in
+    a bounded least-recently-used (LRU) cache, so memory never exceeds
+    O(n * self._capacity).
 
-class DecisionTree:
-    """A decision tree used to filter jobs based on certain preferences.
+    NOTE: The vertices of this graph do not store their neighbours, so the vertices
+    returned by get_vertices have no edges.
+
+    Private Instance Attributes:
+    - _capacity: The maximum number of rows of similarity scores kept in the cache.
+    - _rows: The cached rows of similarity scores, from least to most recently used, where
+    self._rows[job][i] is the similarity score of job and self._arrays.jobs[i].
+    - _arrays: The feature arrays of every job in this graph, or None if they must be rebuilt.
+    - _indices: The index of each job in self._arrays.
+    - _stats: The number of cache hits, misses and evictions so far.
 
     Representation Invariants:
-        - self._root is not None or self._subtrees == []
-        - all(not subtree.is_empty() for subtree in self._subtrees)
+    - self._capacity > 0
+    - len(self._rows) <= self._capacity
+    - self._arrays is None or len(self._arrays) == len(self._vertices)
+    """
+
+    _capacity: int
+    _rows: OrderedDict[Job, np.ndarray]
+    _arrays: Optional[JobArrays]
+    _indices: dict[Job, int]
+    _stats: dict[str, int]
+
+    def __init__(self, capacity: int = 128, profile: Optional[dict[str, float]] = None) -> None:
+        """
+        Initializes a LazyWeightedGraph instance which caches at most <capacity> rows, whose
+        similarity scores use the weight profile <profile> (see src.similarity).
+
+        Preconditions:
+        - capacity > 0
+        """
+        super().__init__(profile=profile)
+        self._capacity = capacity
+        self._rows = OrderedDict()
+        self._arrays = None
+        self._indices = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def add_vertex(self, job: Job) -> None:
+        """
+        Adds a vertex to this weighted graph instance.
+
+        Every cached row becomes stale, so the cache is cleared.
+        """
+        if job not in self._vertices:
+            super().add_vertex(job)
+            self._arrays = None
+            self._rows.clear()
+
+    def add_jobs(self, jobs: list[Job]) -> None:
+        """
+        Adds every job in <jobs> to this weighted graph instance.
+        """
+        for job in jobs:
+            self.add_vertex(job)
+
+    def remove_job(self, job: Job) -> None:
+        """
+        Removes <job> from this weighted graph instance.
+
+        Every cached row becomes stale, so the cache is cleared.
+        """
+        if job not in self._vertices:
+            raise ValueError("Job does not exist in this <WeightedGraph> instance!")
+
+        del self._vertices[job]
+        self._arrays = None
+        self._rows.clear()
+
+    def get_similarity(self, job1: Job, job2: Job) -> float:
+        """
+        Returns the similarity score between job1 and job2, reading it from a cached
+        row if possible, or computing just this one score otherwise.
+
+        Precondititions:
+        - job1 != job2
+        """
+        v1, v2 = self._vertices[job1], self._vertices[job2]
+        if job1 in self._rows:
+            return float(self._rows[job1][self._indices[job2]])
+        elif job2 in self._rows:
+            return float(self._rows[job2][self._indices[job1]])
+        else:
+            return scalar_similarity(v1.item, v2.item, self._profile)
+
+    def get_similar_jobs(
+        self, job: Job, limit: Optional[int] = 5, offset: Optional[int] = 10
+    ) -> list[Job]:
+        """
+        Returns the <limit> jobs with the highest similarity score to <job>.
+
+        The <offset>  offset introduced to introduce a 'random'
+        aspect to the <limit> similar jobs retrieved.
+        """
+        if (offset + limit) > len(self):
+            raise ValueError("Limit / Offset are too high!")
+        elif job not in self._vertices:
+            raise ValueError("Job does not exist in this <WeightedGraph> instance!")
+
+        row = self._get_row(job).copy()
+        row[self._indices[job]] = -np.inf
+        num_candidates = min(limit + 10, len(row) - 1)
+        candidates = np.argpartition(-row, num_candidates - 1)[:num_candidates]
+
+        similar_jobs = [self._arrays.jobs[i] for i in candidates.tolist()]
+
+        return sample(similar_jobs, limit)
+
+    def get_similar_jobs_batch(
+        self, jobs: list[Job], k: int = 15, workers: Optional[int] = None, use_processes: bool = False
+    ) -> list[list[Job]]:
+        """
+        Returns, for each job in <jobs>, the (at most) <k> jobs with the highest similarity
+        score to it, from highest to lowest score.
+
+        The rows of every query are computed directly by the similarity engine, bypassing
+        the cache. If <workers> is not None, the queries are split across <workers>
+        threads, or processes if <use_processes> is True.
+
+        Preconditions:
+        - all(job in self._vertices for job in jobs)
+        - k > 0
+        """
+        if any(job not in self._vertices for job in jobs):
+            raise ValueError("Job does not exist in this <WeightedGraph> instance!")
+
+        self._ensure_arrays()
+        rows = np.array([self._indices[job] for job in jobs], dtype=np.int64)
+        indices, _ = batch_top_k(self._arrays, rows, k, workers, use_processes)
+        return [[self._arrays.jobs[j] for j in row] for row in indices.tolist()]
+
+    def cache_info(self) -> dict[str, int]:
+        """
+        Returns the number of cache hits, misses and evictions so far, along with the
+        current size and the capacity of the cache.
+        """
+        return {**self._stats, "size": len(self._rows), "capacity": self._capacity}
+
+    def _get_row(self, job: Job) -> np.ndarray:
+        """
+        Returns the row of similarity scores between <job> and every job in this graph,
+        computing and caching it if it is not already cached.
+        """
+        if job in self._rows:
+            self._stats["hits"] += 1
+            self._rows.move_to_end(job)
+            return self._rows[job]
+
+        self._stats["misses"] += 1
+        self._ensure_arrays()
+        row = similarity_block(self._arrays, np.array([self._indices[job]]))[0]
+        self._rows[job] = row
+        if len(self._rows) > self._capacity:
+            self._rows.popitem(last=False)
+            self._stats["evictions"] += 1
+        return row
+
+    def _ensure_arrays(self) -> None:
+        """
+        Rebuilds the feature arrays of every job in this graph, if they are stale.
+        """
+        if self._arrays is None:
+            self._arrays = JobArrays(list(self._vertices))
+            self._arrays.profile = self._profile
+            self._indices = {other: i for i, other in enumerate(self._arrays.jobs)}
+
+
+class ApproximateWeightedGraph(WeightedGraph):
+    """
+    Class representing a weighted graph whose similar jobs are found approximately with
+    a MinHash LSH index, so no edges are ever stored.
+
+    get_similar_jobs only scores the candidates the index finds for a job, exactly, with
+    similarity_calculation. The index is (re)built the first time it is needed after the
+    vertices change.
 
     Private Instance Attributes:
-    - _root: The set of jobs stored at this DecisionTree's root
-    - _left: The left subtree of this DecisionTree
-    - _right: The right subtree of this DecisionTree
+    - _num_bands: The number of LSH bands of the index; more bands give higher recall
+    but larger candidate sets.
+    - _rows_per_band: The number of MinHash values in each band of the index.
+    - _index: The MinHash LSH index over every job in this graph, or None if it must be rebuilt.
+
+    Representation Invariants:
+    - all(v.neighbours == {} for v in self._vertices.values())
+    - self._index is None or len(self._index.jobs) == len(self._vertices)
     """
 
-    _root: set[Job]
-    _left: Optional[DecisionTree] = None
-    _right: Optional[DecisionTree] = None
+    _num_bands: int
+    _rows_per_band: int
+    _index: Optional[MinHashIndex]
 
-    def __init__(self) -> None:
+    def __init__(self, num_bands: int = 16, rows_per_band: int = 2) -> None:
         """
-        Initialize a DecisionTree instance.
+        Initializes an ApproximateWeightedGraph instance with the given LSH parameters.
+
+        Preconditions:
+        - num_bands > 0 and rows_per_band > 0
         """
-        self._root = set()
+        super().__init__()
+        self._num_bands = num_bands
+        self._rows_per_band = rows_per_band
+        self._index = None
 
-    def insert(self, job: Job, depth: int = 0) -> None:
+    def add_vertex(self, job: Job) -> None:
+        """
+        Adds a vertex to this weighted graph instance.
         """
-        Inserts <job> into the decision tree based on <job.decisions>.
+        if job not in self._vertices:
+            super().add_vertex(job)
+            self._index = None
 
-        Preconditions:
-        - all([i in {0, 1} for i in job.decisions])
+    def add_jobs(self, jobs: list[Job]) -> None:
         """
-        decisions = job.decisions
-        if len(decisions) == depth:
-            if self._root is None:
-                self._root = set()
-            self._root.add(job)
-        else:
-            curr = decisions[0]
-            if curr == 0:
-                if self._left is None:
-                    self._left = DecisionTree()
-                self._left.insert(job, depth + 1)
-            else:  # curr == 1
-                if self._right is None:
-                    self._right = DecisionTree()
-                self._right.insert(job, depth + 1)
+        Adds every job in <jobs> to this weighted graph instance.
+        """
+        for job in jobs:
+            self.add_vertex(job)
 
-    def get_jobs(self, decisions: list[int]) -> set[Job]:
+    def remove_job(self, job: Job) -> None:
         """
-        Returns the set of jobs in the tree corresponding to
-        the path given by <decisions>. If not enough jobs
-        correspond to the path, it randomly adjusts decisions
-        until there are enough paths.
+        Removes <job> from this weighted graph instance.
         """
-        for i in range(len(decisions)):
-            j = self.get_jobs_helper(decisions.copy())
-            if len(j) >= 5:
-                return j
-            decisions[i] = 2
-        return self.get_jobs_helper(decisions.copy())
+        if job not in self._vertices:
+            raise ValueError("Job does not exist in this <WeightedGraph> instance!")
+
+        del self._vertices[job]
+        self._index = None
 
-    def get_jobs_helper(self, decisions: list[int]) -> set[Job]:
+    def get_similarity(self, job1: Job, job2: Job) -> float:
         """
-        Returns the set of jobs in the tree corresponding to
-        the path given by <decisions>.
+        Returns the similarity score between job1 and job2, computed on demand.
+
+        Precondititions:
+        - job1 != job2
         """
-        if not decisions:
-            return self._root
-        else:
-            curr = decisions.pop(0)
-            if curr == 0:
-                if self._left is None:
-                    return set()
-                return self._left.get_jobs(decisions)
-            elif curr == 1:
-                if self._right is None:
-                    return set()
-                return self._right.get_jobs(decisions)
-            else:  # 2 => traverse both
-                left = (
-                    self._left.get_jobs(decisions) if self._left is not None else set()
-                )
-                right = (
-                    self._right.get_jobs(decisions)
-                    if self._right is not None
-                    else set()
-                )
-                return set.union(left, right)
+        return self._vertices[job1].calculate_similarity(self._vertices[job2])
+
+    def get_similar_jobs(
+        self, job: Job, limit: Optional[int] = 5, offset: Optional[int] = 10
+    ) -> list[Job]:
+        """
+        Returns <limit> jobs sampled from the <limit> + 10 candidates from the LSH index
+        with the highest similarity score to <job>.
+        """
+        if job not in self._vertices:
+            raise ValueError("Job does not exist in this <WeightedGraph> instance!")
+        if self._index is None:
+            self._index = MinHashIndex(list(self._vertices), self._num_bands, self._rows_per_band)
+        return self._index.get_similar_jobs(job, limit, offset)
 
+    def _neighbour_row(self, job: Job) -> tuple[list[Job], np.ndarray]:
+        """
+        Returns the LSH candidates of <job> and their similarity scores to <job>, in the same order.
+        """
+        if self._index is None:
+            self._index = MinHashIndex(list(self._vertices), self._num_bands, self._rows_per_band)
+        candidates = list(self._index.candidates(job))
+        return candidates, np.array([similarity_calculation(job, other) for other in candidates])
 
-def load_graph_and_tree() -> tuple[WeightedGraph, DecisionTree]:
+
+class CSRWeightedGraph(WeightedGraph):
     """
-    Returns a <WeightedGraph> of every job stored in <jobs.csv>.
+    Class representing a weighted graph whose adjacency is stored in compressed sparse
+    row (CSR) arrays rather than in a dict per vertex.
+
+    Each job is identified by its integer index in self._jobs. The neighbours of job i are
+    self._ids[self._indptr[i]:self._indptr[i + 1]], and the weights of those edges are
+    the same slice of self._weights. An edge costs 8 bytes, rather than the 100+ bytes
+    of a dict entry, or as little as 5 bytes if its weight is quantized (see
+    src.similarity.quantize_weights).
 
-    NOTE: Inherently, constructing a complete graph is O(n^2).
+    The neighbours of each job are stored from highest to lowest weight, so get_similar_jobs
+    only slices the front of a row.
+
+    NOTE: The adjacency of this graph cannot be modified once built, except by adding
+    vertices without any edges.
+
+    Private Instance Attributes:
+    - _jobs: The jobs in this graph, in order of their integer id.
+    - _ids: The integer id of each job in this graph.
+    - _indptr: The offsets of each job's neighbours in self._neighbour_ids and self._weights.
+    - _neighbour_ids: The integer ids of every job's neighbours, concatenated.
+    - _weights: The weights of every job's edges, concatenated, as stored in the dtype the
+    graph was built with.
+    - _scale: The scale of the stored weights, so that an edge's weight is approximately
+    its stored weight * self._scale + self._offset.
+    - _offset: The offset of the stored weights.
+
+    Representation Invariants:
+    - all(self._weights[j] >= self._weights[j + 1] for i in range(len(self._jobs))
+          for j in range(self._indptr[i], self._indptr[i + 1] - 1))
+    - len(self._indptr) == len(self._jobs) + 1
+    - self._indptr[0] == 0 and self._indptr[-1] == len(self._neighbour_ids) == len(self._weights)
+    - all(self._ids[self._jobs[i]] == i for i in range(len(self._jobs)))
     """
-    g = WeightedGraph()
-    jobs = load_jobs_csv()
-    new_tree = DecisionTree()
-    for job in jobs:
-        g.add_vertex(job)
-        new_tree.insert(job)
-    count = 0
-    for job1 in jobs:  # no optimization available :(
-        count += 1
-        for job2 in jobs:
-            if job1 != job2:
-                g.add_edge(job1, job2)
-    return g, new_tree
+
+    _jobs: list[Job]
+    _ids: dict[Job, int]
+    _indptr: np.ndarray
+    _neighbour_ids: np.ndarray
+    _weights: np.ndarray
+    _scale: float
+    _offset: float
+
+    def __init__(self, jobs: list[Job], indptr: np.ndarray, neighbour_ids: np.ndarray,
+                 weights: np.ndarray, weight_dtype: str = "float32",
+                 scale: Optional[float] = None, offset: float = 0.0,
+                 profile: Optional[dict[str, float]] = None) -> None:
+        """
+        Initializes a CSRWeightedGraph instance of <jobs> from the given CSR arrays, whose
+        rows must already be sorted from highest to lowest weight.
+
+        The weights are stored quantized to <weight_dtype>, one of
+        src.similarity.WEIGHT_DTYPES, which raises ValueError if it is unknown. If <scale>
+        is not None, <weights> were already quantized with <scale> and <offset>, and are
+        stored as they are.
+
+        <profile> is the weight profile of the similarity scores (see src.similarity), used
+        for scores computed on demand.
+
+        Preconditions:
+        - len(indptr) == len(jobs) + 1
+        - len(neighbour_ids) == len(weights) == indptr[-1]
+        - all(0 <= i < len(jobs) for i in neighbour_ids)
+        """
+        super().__init__(profile=profile)
+        self._jobs = list(jobs)
+        self._ids = {job: i for i, job in enumerate(self._jobs)}
+        self._indptr = np.asarray(indptr, dtype=np.int64)
+        self._neighbour_ids = np.asarray(neighbour_ids, dtype=np.int32)
+        if scale is None:
+            self._weights, self._scale, self._offset = quantize_weights(weights, weight_dtype)
+        else:
+            self._weights, self._scale, self._offset = np.asarray(weights, dtype=weight_dtype), scale, offset
+
+    def add_vertex(self, job: Job) -> None:
+        """
+        Adds a vertex without any edges to this weighted graph instance.
+        """
+        if job not in self._ids:
+            self._ids[job] = len(self._jobs)
+            self._jobs.append(job)
+            self._indptr = np.append(self._indptr, self._indptr[-1])
+
+    def add_edge(self, job1: Job, job2: Job) -> None:
+        """
+        Raises ValueError, since the adjacency of this graph cannot be modified.
+        """
+        raise ValueError("The edges of a <CSRWeightedGraph> cannot be modified!")
+
+    def add_weighted_edges(self, job: Job, others: list[Job], weights: list[float]) -> None:
+        """
+        Raises ValueError, since the adjacency of this graph cannot be modified.
+        """
+        raise ValueError("The edges of a <CSRWeightedGraph> cannot be modified!")
+
+    def set_neighbours(self, job: Job, neighbours: list[tuple[Job, float]]) -> None:
+        """
+        Raises ValueError, since the adjacency of this graph cannot be modified.
+        """
+        raise ValueError("The edges of a <CSRWeightedGraph> cannot be modified!")
+
+    def add_jobs(self, jobs: list[Job]) -> None:
+        """
+        Raises ValueError, since the adjacency of this graph cannot be modified.
+        """
+        raise ValueError("The edges of a <CSRWeightedGraph> cannot be modified!")
+
+    def remove_job(self, job: Job) -> None:
+        """
+        Raises ValueError, since the adjacency of this graph cannot be modified.
+        """
+        raise ValueError("The edges of a <CSRWeightedGraph> cannot be modified!")
+
+    def get_similarity(self, job1: Job, job2: Job) -> float:
+        """
+        Returns the similarity score between job1 and job2.
+
+        If neither job kept the other as a neighbour, the similarity score is computed on demand.
+
+        Precondititions:
+        - job1 != job2
+        """
+        i, j = self._ids[job1], self._ids[job2]
+        for a, b in ((i, j), (j, i)):
+            start, end = self._indptr[a], self._indptr[a + 1]
+            found = np.flatnonzero(self._neighbour_ids[start:end] == b)
+            if len(found) > 0:
+                return float(self._weights[start + found[0]] * self._scale + self._offset)
+        return self._score(job1, job2)
+
+    def get_similar_jobs(
+        self, job: Job, limit: Optional[int] = 5, offset: Optional[int] = 10
+    ) -> list[Job]:
+        """
+        Returns the <limit> jobs with the highest similarity score to <job>.
+
+        The <offset>  offset introduced to introduce a 'random'
+        aspect to the <limit> similar jobs retrieved.
+
+        NOTE: If this graph is sparse and keeps fewer than <limit> neighbours of <job>,
+        all of them are returned.
+        """
+        if (offset + limit) > len(self):
+            raise ValueError("Limit / Offset are too high!")
+        elif job not in self._ids:
+            raise ValueError("Job does not exist in this <WeightedGraph> instance!")
+
+        i = self._ids[job]
+        start, end = self._indptr[i], self._indptr[i + 1]
+
+        similar_jobs = [self._jobs[j] for j in self._neighbour_ids[start:min(start + limit + 10, end)].tolist()]
+
+        return sample(similar_jobs, min(limit, len(similar_jobs)))
+
+    def _neighbour_row(self, job: Job) -> tuple[list[Job], np.ndarray]:
+        """
+        Returns the neighbours of <job> and the weights of their edges to <job>, in the same order.
+        """
+        i = self._ids[job]
+        start, end = self._indptr[i], self._indptr[i + 1]
+        weights = dequantize_weights(self._weights[start:end], self._scale, self._offset)
+        return [self._jobs[j] for j in self._neighbour_ids[start:end].tolist()], weights
+
+    def get_vertices(self) -> dict[Job, _WeightedVertex]:
+        """
+        Returns a mapping from each job to a vertex holding its neighbours.
+
+        NOTE: The vertices are materialized from the CSR arrays on every call, which takes
+        O(number of edges) time and memory.
+        """
+        vertices = {job: _WeightedVertex(job) for job in self._jobs}
+        for i, job in enumerate(self._jobs):
+            start, end = self._indptr[i], self._indptr[i + 1]
+            neighbour_ids = self._neighbour_ids[start:end].tolist()
+            weights = dequantize_weights(self._weights[start:end], self._scale, self._offset).tolist()
+            vertices[job].neighbours = {
+                vertices[self._jobs[j]]: w for j, w in zip(neighbour_ids, weights)
+            }
+        return vertices
+
+    def get_average_salary(self) -> int:
+        """
+        Returns the estimated average salary of all jobs
+        stored in this graph.
+        """
+        total = 0.0
+        for job in self._jobs:
+            total += job.get_annual_pay()
+        return int(total / len(self))
+
+    def csr_arrays(self) -> tuple[list[Job], np.ndarray, np.ndarray, np.ndarray, float, float]:
+        """
+        Returns a tuple (jobs, indptr, neighbour_ids, weights, scale, offset) of the
+        arguments which build a <CSRWeightedGraph> equal to this graph.
+        """
+        return self._jobs, self._indptr, self._neighbour_ids, self._weights, self._scale, self._offset
+
+    def nbytes(self) -> int:
+        """
+        Returns the number of bytes used by the CSR arrays of this graph.
+        """
+        return self._indptr.nbytes + self._neighbour_ids.nbytes + self._weights.nbytes
+
+    def __contains__(self, job: Job) -> bool:
+        """
+        Returns whether <job> is a vertex in this CSRWeightedGraph instance.
+        """
+        return job in self._ids
+
+    def __len__(self) -> int:
+        """
+        Returns the length of this CSRWeightedGraph instance.
+        """
+        return len(self._jobs)
+
+
+def csr_from_matrix(
+    jobs: list[Job], matrix: np.ndarray, depth: Optional[int] = None, weight_dtype: str = "float32",
+    profile: Optional[dict[str, float]] = None
+) -> CSRWeightedGraph:
+    """
+    Returns a <CSRWeightedGraph> of <jobs> whose edge weights are given by the similarity
+    matrix <matrix>, ignoring its diagonal, and stored as <weight_dtype>. <matrix> was
+    computed with the weight profile <profile>.
+
+    The graph is complete if <depth> is None. Otherwise, each row is truncated to its
+    <depth> highest weights.
+
+    Preconditions:
+    - matrix.shape == (len(jobs), len(jobs))
+    - depth is None or depth > 0
+    """
+    n = len(jobs)
+    off_diagonal = ~np.eye(n, dtype=bool)
+    neighbour_ids = np.broadcast_to(np.arange(n), (n, n))[off_diagonal].reshape(n, max(n - 1, 0))
+    weights = np.asarray(matrix)[off_diagonal].reshape(n, max(n - 1, 0))
+
+    order = np.argsort(-weights, axis=1, kind="stable")[:, :depth]
+    neighbour_ids = np.take_along_axis(neighbour_ids, order, axis=1)
+    weights = np.take_along_axis(weights, order, axis=1)
+
+    indptr = np.arange(n + 1, dtype=np.int64) * weights.shape[1]
+    return CSRWeightedGraph(jobs, indptr, np.ravel(neighbour_ids), np.ravel(weights), weight_dtype, profile=profile)
+
+
+def csr_from_top_k(
+    jobs: list[Job], indices: np.ndarray, scores: np.ndarray, weight_dtype: str = "float32",
+    profile: Optional[dict[str, float]] = None
+) -> CSRWeightedGraph:
+    """
+    Returns a sparse <CSRWeightedGraph> of <jobs> from the (indices, scores) matrices
+    returned by src.similarity.top_k_neighbours, with its weights stored as <weight_dtype>.
+    The scores were computed with the weight profile <profile>.
+
+    Preconditions:
+    - indices.shape == scores.shape and indices.shape[0] == len(jobs)
+    """
+    n, k = indices.shape
+    indptr = np.arange(n + 1, dtype=np.int64) * k
+    return CSRWeightedGraph(jobs, indptr, np.ravel(indices), np.ravel(scores), weight_dtype, profile=profile)
+
+
+# ====================================================================================
+# Decision Tree
+# ====================================================================================
+
+
+class DecisionTree:
+    """A decision tree used to filter jobs based on certain preferences.
+
+    Jobs are stored by their integer id in self.registry, which is shared by every
+    subtree, and only mapped back to Job instances by get_jobs.
+
+    Instance Attributes:
+    - registry: The registry of the jobs stored in this DecisionTree.
+    - answers: The precomputed answer of every query of this DecisionTree (see
+    build_answer_table), or None if they have not been computed since it last changed.
+
+    Representation Invariants:
+        - self._root is not None or self._subtrees == []
+        - all(not subtree.is_empty() for subtree in self._subtrees)
+
+    Private Instance Attributes:
+    - _root: The integer ids of the jobs stored at this DecisionTree's root
+    - _left: The left subtree of this DecisionTree
+    - _right: The right subtree of this DecisionTree
+    - _size: The number of jobs stored in this DecisionTree, including its subtrees
+    """
+
+    registry: JobRegistry
+    answers: Optional[AnswerTable] = None
+    _root: set[int]
+    _left: Optional[DecisionTree] = None
+    _right: Optional[DecisionTree] = None
+    _size: int
+
+    def __init__(self, registry: Optional[JobRegistry] = None) -> None:
+        """
+        Initialize a DecisionTree instance of the jobs in <registry> (a new, empty
+        registry if <registry> is None).
+        """
+        self.registry = JobRegistry() if registry is None else registry
+        self._root = set()
+        self._size = 0
+
+    def insert(self, job: Job, depth: int = 0) -> None:
+        """
+        Inserts <job> into the decision tree based on <job.decisions>, registering it in
+        self.registry if it is not already.
+
+        Preconditions:
+        - all([i in {0, 1} for i in job.decisions])
+        """
+        if depth == 0:
+            job = self.registry.add(job)
+            self.answers = None
+        decisions = job.decisions
+        if len(decisions) == depth:
+            if self._root is None:
+                self._root = set()
+            self._root.add(job.id)
+            self._size = len(self._root)
+        else:
+            curr = decisions[depth]
+            if curr == 0:
+                if self._left is None:
+                    self._left = DecisionTree(self.registry)
+                subtree = self._left
+            else:  # curr == 1
+                if self._right is None:
+                    self._right = DecisionTree(self.registry)
+                subtree = self._right
+            size = subtree._size
+            subtree.insert(job, depth + 1)
+            self._size += subtree._size - size
+
+    def remove(self, job: Job, depth: int = 0) -> None:
+        """
+        Removes <job> from the decision tree, following the path given by <job.decisions>.
+        Subtrees left without any jobs are pruned.
+
+        Preconditions:
+        - all([i in {0, 1} for i in job.decisions])
+        """
+        self.answers = None
+        decisions = job.decisions
+        if len(decisions) == depth:
+            self._root.discard(job.id)
+            self._size = len(self._root)
+        elif decisions[depth] == 0 and self._left is not None:
+            size = self._left._size
+            self._left.remove(job, depth + 1)
+            self._size -= size - self._left._size
+            if self._left.is_empty():
+                self._left = None
+        elif decisions[depth] == 1 and self._right is not None:
+            size = self._right._size
+            self._right.remove(job, depth + 1)
+            self._size -= size - self._right._size
+            if self._right.is_empty():
+                self._right = None
+
+    def is_empty(self) -> bool:
+        """
+        Returns whether this decision tree contains no jobs.
+        """
+        return not self._root and self._left is None and self._right is None
+
+    def get_jobs(self, decisions: list[int]) -> set[Job]:
+        """
+        Returns the set of jobs in the tree corresponding to
+        the path given by <decisions>. If not enough jobs
+        correspond to the path, it randomly adjusts decisions
+        until there are enough paths.
+
+        Each relaxation only counts the jobs of its path (see count_jobs), so the set
+        of jobs is built once, for the first path with enough jobs.
+        """
+        return {self.registry[job_id] for job_id in self.get_job_ids(decisions)}
+
+    def get_job_ids(self, decisions: list[int]) -> set[int]:
+        """
+        Returns the integer ids of the jobs get_jobs(<decisions>) returns.
+        """
+        return self.get_jobs_helper(self._relax(decisions))
+
+    def get_ranked_jobs(
+        self, decisions: list[int], score: Optional[Callable[[Job], Any]] = None, page_size: int = 5
+    ) -> Iterator[Job]:
+        """
+        Yields the jobs get_jobs(<decisions>) returns, from highest to lowest <score>,
+        which defaults to preference_score(job, <decisions>).
+
+        The first <page_size> jobs are picked with a heap bounded to <page_size> entries.
+        The rest of the jobs are only sorted if more are requested, so later pages are
+        yielded without querying the tree again.
+
+        Preconditions:
+        - page_size > 0
+        """
+        preferences = list(decisions)
+        if score is None:
+            def score(job: Job) -> tuple[int, float, float]:
+                return preference_score(job, preferences)
+
+        scored = [(score(self.registry[job_id]), -job_id) for job_id in self.get_job_ids(decisions)]
+        page = nlargest(page_size, scored)
+        for _, negative_id in page:
+            yield self.registry[-negative_id]
+        if len(page) < len(scored):
+            scored.sort(reverse=True)
+            for _, negative_id in scored[page_size:]:
+                yield self.registry[-negative_id]
+
+    def get_top_jobs(self, decisions: list[int], limit: int = 5) -> list[Job]:
+        """
+        Returns the first <limit> jobs get_ranked_jobs(<decisions>) yields, which are looked
+        up in self.answers if it has been built.
+
+        Preconditions:
+        - limit > 0
+        """
+        if self.answers is not None:
+            return self.answers.get_jobs(decisions, limit)
+        return list(islice(self.get_ranked_jobs(decisions, page_size=limit), limit))
+
+    def build_answer_table(self, num_decisions: int = 7) -> AnswerTable:
+        """
+        Precomputes the ranked answer of every query of <num_decisions> decisions (see
+        AnswerTable), stores it in self.answers and returns it. The table is discarded
+        whenever a job is inserted or removed.
+        """
+        self.answers = AnswerTable(self, num_decisions)
+        return self.answers
+
+    def _relax(self, decisions: list[int]) -> list[int]:
+        """
+        Returns a copy of <decisions> with its decisions replaced by "don't care", from the
+        first onwards, until at least 5 jobs correspond to its path or every decision is
+        replaced.
+        """
+        decisions = list(decisions)
+        for i in range(len(decisions)):
+            if self.count_jobs(decisions) >= 5:
+                break
+            decisions[i] = 2
+        return decisions
+
+    def get_jobs_helper(self, decisions: list[int]) -> set[int]:
+        """
+        Returns the set of integer ids of the jobs in the tree corresponding to
+        the path given by <decisions>.
+        """
+        found = set()
+        self._collect_jobs(decisions, 0, found)
+        return found
+
+    def _collect_jobs(self, decisions: list[int], depth: int, found: set[int]) -> None:
+        """
+        Adds the integer ids of the jobs in this subtree, at <depth> in the tree,
+        corresponding to the rest of the path given by <decisions> to <found>.
+        """
+        if depth == len(decisions):
+            found.update(self._root)
+        else:
+            curr = decisions[depth]
+            if curr != 1 and self._left is not None:
+                self._left._collect_jobs(decisions, depth + 1, found)
+            if curr != 0 and self._right is not None:
+                self._right._collect_jobs(decisions, depth + 1, found)
+
+    def count_jobs(self, decisions: list[int], depth: int = 0) -> int:
+        """
+        Returns the number of jobs in the tree corresponding to the path given by
+        <decisions>, where this tree is at <depth>.
+
+        Once every remaining decision is a "don't care", the count of the subtree is
+        returned without visiting it.
+        """
+        if all(decision == 2 for decision in decisions[depth:]):
+            return self._size
+        curr = decisions[depth]
+        count = 0
+        if curr != 1 and self._left is not None:
+            count += self._left.count_jobs(decisions, depth + 1)
+        if curr != 0 and self._right is not None:
+            count += self._right.count_jobs(decisions, depth + 1)
+        return count
+
+
+def preference_score(job: Job, decisions: list[int]) -> tuple[int, float, float]:
+    """
+    Returns a score ranking how well <job> fits the preferences <decisions>: the number
+    of decisions it matches (where a "don't care" matches), then its rating, then its pay.
+    """
+    matches = sum(1 for preference, decision in zip(decisions, job.decisions) if preference in {decision, 2})
+    return matches, job.rating, job.get_annual_pay()
+
+
+def decision_mask(decisions: list[int]) -> int:
+    """
+    Returns the bitmask of <decisions>, whose i-th bit is decisions[i].
+
+    Preconditions:
+    - all([i in {0, 1} for i in decisions])
+    """
+    mask = 0
+    for i, decision in enumerate(decisions):
+        mask |= decision << i
+    return mask
+
+
+def matching_masks(decisions: list[int]) -> list[int]:
+    """
+    Returns the bitmask of every list of yes/no decisions matching <decisions>, where a
+    decision of 2 matches both 0 and 1 (i.e., is a "don't care").
+
+    Preconditions:
+    - all([i in {0, 1, 2} for i in decisions])
+    """
+    value = free = 0
+    for i, decision in enumerate(decisions):
+        if decision == 2:
+            free |= 1 << i
+        else:
+            value |= decision << i
+
+    # Enumerate every submask of <free>, from <free> down to 0
+    masks = []
+    submask = free
+    while True:
+        masks.append(value | submask)
+        if submask == 0:
+            return masks
+        submask = (submask - 1) & free
+
+
+class BitmaskDecisionTree(DecisionTree):
+    """A decision tree whose leaves are stored in a flat table of 2^(number of decisions)
+    buckets, indexed by the bitmask of a job's decisions (see decision_mask), rather
+    than at the end of a path of subtrees.
+
+    A path with "don't care" decisions is answered by enumerating the buckets of its
+    matching masks, and the number of jobs it matches is known from their bucket sizes.
+
+    Private Instance Attributes:
+    - _buckets: The integer ids of the jobs whose decisions form each bitmask.
+
+    Representation Invariants:
+    - all(decision_mask(self.registry[i].decisions) == mask
+          for mask in range(len(self._buckets)) for i in self._buckets[mask])
+    """
+
+    _buckets: list[set[int]]
+
+    def __init__(self, registry: Optional[JobRegistry] = None, num_decisions: int = 7) -> None:
+        """
+        Initialize a BitmaskDecisionTree instance of the jobs in <registry> (a new, empty
+        registry if <registry> is None), whose jobs each make <num_decisions> decisions.
+
+        Preconditions:
+        - num_decisions >= 0
+        """
+        super().__init__(registry)
+        self._buckets = [set() for _ in range(1 << num_decisions)]
+
+    def insert(self, job: Job, depth: int = 0) -> None:
+        """
+        Inserts <job> into the bucket of <job.decisions>, registering it in self.registry
+        if it is not already.
+
+        Preconditions:
+        - all([i in {0, 1} for i in job.decisions])
+        - len(job.decisions) == the number of decisions of this tree
+        """
+        job = self.registry.add(job)
+        self.answers = None
+        self._buckets[decision_mask(job.decisions)].add(job.id)
+
+    def remove(self, job: Job, depth: int = 0) -> None:
+        """
+        Removes <job> from the bucket of <job.decisions>.
+
+        Preconditions:
+        - all([i in {0, 1} for i in job.decisions])
+        - len(job.decisions) == the number of decisions of this tree
+        """
+        self.answers = None
+        self._buckets[decision_mask(job.decisions)].discard(job.id)
+
+    def is_empty(self) -> bool:
+        """
+        Returns whether this decision tree contains no jobs.
+        """
+        return not any(self._buckets)
+
+    def get_jobs_helper(self, decisions: list[int]) -> set[int]:
+        """
+        Returns the set of integer ids of the jobs in the tree corresponding to
+        the path given by <decisions>.
+        """
+        return set().union(*(self._buckets[mask] for mask in matching_masks(decisions)))
+
+    def count_jobs(self, decisions: list[int], depth: int = 0) -> int:
+        """
+        Returns the number of jobs in the tree corresponding to the path given by
+        <decisions>, from the sizes of the matching buckets.
+
+        Preconditions:
+        - depth == 0
+        """
+        return sum(len(self._buckets[mask]) for mask in matching_masks(decisions))
+
+
+class AnswerTable:
+    """The precomputed answers of every query of a decision tree.
+
+    Every query's preferences are yes, no or "don't care", so there are only 3^(number of
+    decisions) queries. The table stores the integer ids of the jobs
+    DecisionTree.get_ranked_jobs yields for each query, so answering a query is one
+    lookup rather than a walk of the tree.
+
+    The distinct answers are stored back to back in one array, and queries with identical
+    answers (such as the queries which relax to the same path) share the same storage.
+
+    Instance Attributes:
+    - registry: The registry of the jobs in this table.
+    - num_decisions: The number of decisions of each query.
+    - build_seconds: The time taken to build this table, in seconds.
+
+    Private Instance Attributes:
+    - _answers: The index into self._indptr of each query's answer, by query_index.
+    - _indptr: The answer of index i is self._ids[self._indptr[i]:self._indptr[i + 1]].
+    - _ids: The integer ids of every distinct answer, each ranked from best to worst.
+
+    Representation Invariants:
+    - len(self._answers) == 3 ** self.num_decisions
+    - all(0 <= i < len(self._indptr) - 1 for i in self._answers)
+    """
+
+    registry: JobRegistry
+    num_decisions: int
+    build_seconds: float
+    _answers: np.ndarray
+    _indptr: np.ndarray
+    _ids: np.ndarray
+
+    def __init__(self, tree: DecisionTree, num_decisions: int = 7) -> None:
+        """
+        Initialize an AnswerTable of every query of <num_decisions> decisions of <tree>.
+
+        Each query is relaxed and answered by <tree>, then its jobs are ranked by
+        preference_score with the same order as get_ranked_jobs, using arrays of every
+        job's decisions, rating and pay rather than scoring one job at a time.
+
+        Preconditions:
+        - every job in tree makes <num_decisions> decisions
+        """
+        start = time.perf_counter()
+        self.registry = tree.registry
+        self.num_decisions = num_decisions
+
+        # Indexed by integer id, where the rows of free ids are never read
+        jobs = list(self.registry)
+        ids = [job.id for job in jobs]
+        decisions = np.zeros((len(self.registry.jobs), num_decisions), dtype=np.int8)
+        ratings = np.zeros(len(self.registry.jobs), dtype=np.float64)
+        pays = np.zeros(len(self.registry.jobs), dtype=np.float64)
+        decisions[ids] = np.array([job.decisions for job in jobs], dtype=np.int8).reshape(len(jobs), num_decisions)
+        ratings[ids] = [job.rating for job in jobs]
+        pays[ids] = [job.get_annual_pay() for job in jobs]
+
+        self._answers = np.empty(3 ** num_decisions, dtype=np.int32)
+        slots = {}
+        answers = []
+        for code in range(3 ** num_decisions):
+            query = [(code // 3 ** i) % 3 for i in range(num_decisions)]
+            ids = np.fromiter(tree.get_job_ids(query), dtype=np.int32)
+            preferences = np.array(query, dtype=np.int8)
+            matches = ((decisions[ids] == preferences) | (preferences == 2)).sum(axis=1)
+            ids = ids[np.lexsort((ids, -pays[ids], -ratings[ids], -matches))]
+            key = ids.tobytes()
+            if key not in slots:
+                slots[key] = len(answers)
+                answers.append(ids)
+            self._answers[code] = slots[key]
+
+        self._indptr = np.zeros(len(answers) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in answers], out=self._indptr[1:])
+        self._ids = np.concatenate(answers) if answers else np.empty(0, dtype=np.int32)
+        self.build_seconds = time.perf_counter() - start
+
+    def query_index(self, decisions: list[int]) -> int:
+        """
+        Returns the index of the query <decisions> in this table, reading it as a base 3
+        number whose i-th digit is decisions[i].
+
+        Preconditions:
+        - len(decisions) == self.num_decisions
+        - all([i in {0, 1, 2} for i in decisions])
+        """
+        index = 0
+        for decision in reversed(decisions):
+            index = index * 3 + decision
+        return index
+
+    def lookup(self, decisions: list[int]) -> np.ndarray:
+        """
+        Returns the integer ids of the ranked answer of the query <decisions>, as a
+        read-only view of this table.
+
+        Preconditions:
+        - len(decisions) == self.num_decisions
+        - all([i in {0, 1, 2} for i in decisions])
+        """
+        answer = self._answers[self.query_index(decisions)]
+        ids = self._ids[self._indptr[answer]:self._indptr[answer + 1]]
+        ids.flags.writeable = False
+        return ids
+
+    def get_jobs(self, decisions: list[int], limit: Optional[int] = None) -> list[Job]:
+        """
+        Returns the jobs of the ranked answer of the query <decisions>, keeping only the
+        first <limit> of them if <limit> is not None.
+
+        Preconditions:
+        - len(decisions) == self.num_decisions
+        - all([i in {0, 1, 2} for i in decisions])
+        """
+        return [self.registry[job_id] for job_id in self.lookup(decisions)[:limit].tolist()]
+
+    @property
+    def num_answers(self) -> int:
+        """
+        Returns the number of distinct answers stored in this table.
+        """
+        return len(self._indptr) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns the number of bytes of the arrays of this table.
+        """
+        return self._answers.nbytes + self._indptr.nbytes + self._ids.nbytes
+
+    def report(self) -> dict[str, Any]:
+        """
+        Returns the build time in seconds, the size in bytes, and the numbers of queries,
+        distinct answers and stored job ids of this table.
+        """
+        return {
+            "build_seconds": self.build_seconds,
+            "nbytes": self.nbytes,
+            "queries": len(self._answers),
+            "answers": self.num_answers,
+            "ids": len(self._ids),
+        }
+
+
+def load_graph_and_tree(
+    top_k: Optional[int] = None,
+    lazy_capacity: Optional[int] = None,
+    cache_dir: Optional[str] = "data/cache",
+    workers: Optional[int] = None,
+    chunk_size: int = 256,
+    distance_tolerance: Optional[float] = None,
+    lsh_bands: Optional[int] = None,
+    csr: bool = False,
+    weight_profile: Optional[dict[str, float]] = None,
+    rank_depth: Optional[int] = 15,
+    max_build_memory: Optional[int] = None,
+    weight_dtype: str = "float32",
+    file: str = "data/jobs.csv",
+    answer_table: bool = False,
+) -> tuple[WeightedGraph, DecisionTree]:
+    """
+    Returns a <WeightedGraph> of every job stored in <jobs.csv>, which is read from <file>,
+    and a <BitmaskDecisionTree> of those jobs.
+
+    If <top_k> is None, the graph is complete. Otherwise, the graph is sparse and each
+    vertex only keeps its <top_k> most similar neighbours, which are picked with a
+    bounded heap while the similarity scores are computed.
+
+    If <lazy_capacity> is not None, a <LazyWeightedGraph> caching at most <lazy_capacity>
+    rows is returned instead, so no similarity scores are computed up front. Similarly, if
+    <lsh_bands> is not None, an <ApproximateWeightedGraph> with an LSH index of <lsh_bands>
+    bands is returned. Since these graphs compute their similarity scores on demand,
+    ValueError is raised if both are given, or if either is given with <top_k>, <csr>,
+    <workers>, <distance_tolerance> or <max_build_memory>.
+
+    If <csr> is True, the (complete or top-k) graph is a <CSRWeightedGraph>, which stores
+    its edges in compact arrays rather than in a dict per vertex.
+
+    If <cache_dir> is not None, the computed similarity scores are written to <cache_dir>,
+    keyed by a hash of <jobs.csv> and the similarity weights, and later calls memory-map
+    them from there instead of recomputing them.
+
+    If <workers> is not None, the similarity scores are computed in blocks of <chunk_size>
+    rows by <workers> processes, giving the same graph as a serial build.
+
+    If <distance_tolerance> is not None, a spatial index prunes the distance computation of
+    jobs too far apart for their distance similarity to exceed <distance_tolerance>, and
+    treats it as 0 instead. The number of pairs pruned is kept as the graph's pruned_pairs.
+    ValueError is raised unless 0 < <distance_tolerance> < 1.
+
+    If <weight_profile> is not None, it maps the names of registered similarity components
+    (see src.similarity.SIMILARITY_COMPONENTS) to their weights, replacing the default
+    weights of similarity_calculation. The graph keeps <weight_profile>, so scores computed
+    on demand for pairs missing from a sparse graph, and scores of jobs added later by
+    update_graph_and_tree, use it too. An <ApproximateWeightedGraph> always uses the
+    default weights, so ValueError is raised if <weight_profile> is given with <lsh_bands>.
+
+    If <rank_depth> is not None, the <rank_depth> most similar neighbours of every vertex are
+    ranked ahead of time (see WeightedGraph.rank_neighbours), so that get_similar_jobs takes
+    O(limit) time. A <CSRWeightedGraph> always keeps its rows ranked.
+
+    If <max_build_memory> is not None, the similarity scores are computed in blocks sized so
+    that computing them takes at most <max_build_memory> bytes (see
+    src.similarity.block_size_for_memory), raising ValueError if they cannot. A sparse graph
+    reduces each tile to per-row top-k before discarding it, so it scales to far more jobs
+    than a complete graph, whose n x n matrix must itself fit in the budget.
+
+    If <csr> is True, the edge weights are stored as <weight_dtype>, one of
+    src.similarity.WEIGHT_DTYPES. Quantizing them to float16 or uint8 trades precision for
+    memory; src.similarity.quantization_report measures how much ranking fidelity is lost.
+    Other graphs store weights as Python floats, so ValueError is raised if <weight_dtype>
+    is not "float32" and <csr> is False.
+
+    If <answer_table> is True, the answer of every query of the tree is precomputed (see
+    DecisionTree.build_answer_table), so that get_top_jobs is a single array lookup.
+
+    NOTE: Inherently, constructing a complete graph is O(n^2). However, every similarity
+    score is computed at once by the vectorized engine in src.similarity, so the only
+    per-pair work done in Python is storing the edge weights.
+    """
+    if weight_profile is not None:
+        check_profile(weight_profile)
+    if weight_dtype != "float32" and not csr:
+        raise ValueError("Only a <CSRWeightedGraph> can store quantized weights!")
+    if distance_tolerance is not None and not 0 < distance_tolerance < 1:
+        raise ValueError("<distance_tolerance> must be strictly between 0 and 1!")
+    if lazy_capacity is not None and lsh_bands is not None:
+        raise ValueError("Only one of <lazy_capacity> and <lsh_bands> can be given!")
+    if lazy_capacity is not None or lsh_bands is not None:
+        build_options = {
+            "top_k": top_k, "csr": csr or None, "workers": workers,
+            "distance_tolerance": distance_tolerance, "max_build_memory": max_build_memory,
+        }
+        conflicting = [f"<{name}>" for name, value in build_options.items() if value is not None]
+        if conflicting:
+            raise ValueError(
+                f"{', '.join(conflicting)} cannot be given for a graph which computes its similarity scores on demand!"
+            )
+    if lsh_bands is not None and weight_profile is not None:
+        raise ValueError("An <ApproximateWeightedGraph> always uses the default weights!")
+
+    if lazy_capacity is not None:
+        g = LazyWeightedGraph(lazy_capacity, weight_profile)
+    elif lsh_bands is not None:
+        g = ApproximateWeightedGraph(lsh_bands)
+    else:
+        g = WeightedGraph(top_k, weight_profile)
+    registry = load_job_registry(file)
+    jobs = registry.jobs
+    new_tree = BitmaskDecisionTree(registry)
+    for job in jobs:
+        g.add_vertex(job)
+        new_tree.insert(job)
+
+    if answer_table:
+        new_tree.build_answer_table()
+
+    if lazy_capacity is not None or lsh_bands is not None:
+        return g, new_tree
+
+    options = {
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "distance_tolerance": distance_tolerance,
+        "weight_profile": weight_profile,
+        "max_build_memory": max_build_memory,
+        "file": file,
+    }
+    computed = _compute_or_load(jobs, top_k, cache_dir, options)
+    if csr and top_k is None:
+        g = csr_from_matrix(jobs, computed["matrix"], weight_dtype=weight_dtype, profile=weight_profile)
+    elif csr:
+        g = csr_from_top_k(jobs, computed["indices"], computed["scores"], weight_dtype, weight_profile)
+    elif top_k is None:
+        matrix = computed["matrix"]
+        for i in range(len(jobs)):
+            g.add_weighted_edges(jobs[i], jobs[i + 1:], matrix[i, i + 1:].tolist())
+    else:
+        for i in range(len(jobs)):
+            neighbours = computed["indices"][i].tolist()
+            similarities = computed["scores"][i].tolist()
+            g.set_neighbours(jobs[i], [(jobs[j], sim) for j, sim in zip(neighbours, similarities)])
+
+    if "pruned_pairs" in computed:
+        g.pruned_pairs = int(computed["pruned_pairs"])
+    if rank_depth is not None and not csr:
+        g.rank_neighbours(rank_depth)
+    return g, new_tree
+
+
+def update_graph_and_tree(
+    g: WeightedGraph, tree: DecisionTree, new_jobs: list[Job], expired_jobs: list[Job]
+) -> None:
+    """
+    Applies a delta of job postings to <g> and <tree>: every job in <expired_jobs> is
+    removed, then every job in <new_jobs> is added, without rebuilding either structure.
+
+    Each expired job is looked up by its job id in tree.registry, so it may be a newly
+    parsed copy of a job in <g>, and is skipped if no such job is in <g>. Expired jobs are
+    also removed from tree.registry, so their integer ids are reused by new jobs.
+
+    A new job whose job id is already in <g> is skipped if its details are unchanged, and
+    otherwise replaces that job, as if it had expired. Only the first of several new jobs
+    with the same job id is kept. If tree.answers had been built, it is rebuilt once every
+    job has been applied, and so are the neighbour rankings of <g> which were discarded
+    (see WeightedGraph.rerank_neighbours).
+    """
+    answers = tree.answers
+    posted = {}
+    for job in new_jobs:
+        posted.setdefault(str(job), job)
+    expired = [tree.registry.get(str(job)) for job in expired_jobs]
+    for job_id, job in posted.items():
+        registered = tree.registry.get(job_id)
+        if registered is not None and registered is not job and dict(registered.job_details) != dict(job.job_details):
+            expired.append(registered)
+    for job in dict.fromkeys(expired):
+        if job is not None and job in g:
+            g.remove_job(job)
+            tree.remove(job)
+            tree.registry.remove(job)
+    new_jobs = [job for job in (tree.registry.add(job) for job in posted.values()) if job not in g]
+    g.add_jobs(new_jobs)
+    for job in new_jobs:
+        tree.insert(job)
+    g.rerank_neighbours()
+    if answers is not None:
+        tree.build_answer_table(answers.num_decisions)
+
+
+# The fields of Job.job_details stored in a snapshot's string table and float column
+# section, respectively.
+_SNAPSHOT_STRING_FIELDS = [
+    "job_title", "employer_name", "link", "skills", "city", "country", "pay_period", "job_id",
+]
+_SNAPSHOT_FLOAT_FIELDS = ["rating", "latitutde", "longitude", "pay"]
+
+
+def save_snapshot(g: WeightedGraph, file: str = "data/snapshot.bin") -> None:
+    """
+    Writes a binary snapshot of <g> and its jobs to <file>, which load_snapshot turns back
+    into the same graph and its DecisionTree without parsing <jobs.csv> or computing any
+    similarity scores (see src.snapshot for the file format).
+
+    The adjacency of <g> is stored as CSR arrays, with each row sorted from highest to
+    lowest weight, and the string fields of every job in one packed string table. Weights
+    are stored in the dtype of a <CSRWeightedGraph>, or as float32 otherwise. The
+    DecisionTree is not stored, since it is determined by the decisions of the jobs.
+
+    The descriptions of every job are stored as packed by the job, and its skill names
+    as parsed by the job, so that load_snapshot restores each job with Job.restore.
+
+    Raises ValueError if <g> computes its similarity scores on demand, i.e., is a
+    <LazyWeightedGraph> or an <ApproximateWeightedGraph>.
+    """
+    if isinstance(g, (LazyWeightedGraph, ApproximateWeightedGraph)):
+        raise ValueError("Only a graph which stores its edges can be snapshotted!")
+
+    jobs, indptr, neighbour_ids, weights, scale, offset = g.csr_arrays()
+    blob, string_offsets = pack_strings(
+        [str(job.job_details[field]) for field in _SNAPSHOT_STRING_FIELDS for job in jobs]
+    )
+    desc_blob, desc_offsets = pack_bytes(
+        [packed for job in jobs for packed in job.packed_descs]
+    )
+    skill_names = [sorted(job.features.skill_names) for job in jobs]
+    skill_blob, skill_offsets = pack_strings([name for names in skill_names for name in names])
+    skill_indptr = np.zeros(len(jobs) + 1, dtype=np.int64)
+    np.cumsum([len(names) for names in skill_names], out=skill_indptr[1:])
+    sections = {
+        "strings": blob,
+        "string_offsets": string_offsets,
+        "descs": desc_blob,
+        "desc_offsets": desc_offsets,
+        "skill_names": skill_blob,
+        "skill_name_offsets": skill_offsets,
+        "skill_indptr": skill_indptr,
+        "floats": np.array(
+            [[job.job_details[field] for field in _SNAPSHOT_FLOAT_FIELDS] for job in jobs], dtype=np.float64
+        ).reshape(len(jobs), len(_SNAPSHOT_FLOAT_FIELDS)),
+        "decisions": np.array([job.decisions for job in jobs], dtype=np.uint8).reshape(len(jobs), NUM_DECISIONS),
+        "attribute_flags": np.array([job.attribute_flags for job in jobs], dtype=np.uint8),
+        "indptr": indptr,
+        "neighbour_ids": neighbour_ids,
+        "weights": weights,
+    }
+    meta = {
+        "num_jobs": len(jobs), "weight_dtype": weights.dtype.name, "scale": scale, "offset": offset,
+        "profile": g.profile,
+    }
+    write_snapshot(file, sections, meta)
+
+
+def load_snapshot(file: str = "data/snapshot.bin") -> tuple[CSRWeightedGraph, DecisionTree]:
+    """
+    Returns the graph written to <file> by save_snapshot, as a <CSRWeightedGraph> whose
+    arrays are memory-mapped from <file>, and a <BitmaskDecisionTree> of its jobs.
+
+    Raises ValueError if <file> is not a snapshot of the current snapshot version.
+    """
+    sections, meta = read_snapshot(file)
+    n = meta["num_jobs"]
+    strings = unpack_strings(sections["strings"], sections["string_offsets"])
+    columns = {field: strings[i * n:(i + 1) * n] for i, field in enumerate(_SNAPSHOT_STRING_FIELDS)}
+    for i, field in enumerate(_SNAPSHOT_FLOAT_FIELDS):
+        columns[field] = sections["floats"][:, i].tolist()
+
+    decisions = sections["decisions"].tolist()
+    attribute_flags = sections["attribute_flags"].tolist()
+    descs = unpack_bytes(sections["descs"], sections["desc_offsets"])
+    skill_names = unpack_strings(sections["skill_names"], sections["skill_name_offsets"])
+    skill_bounds = sections["skill_indptr"].tolist()
+    jobs = [
+        Job.restore(
+            {field: column[i] for field, column in columns.items()}, decisions[i], attribute_flags[i],
+            (descs[2 * i], descs[2 * i + 1]),
+            frozenset(skill_names[skill_bounds[i]:skill_bounds[i + 1]]),
+        )
+        for i in range(n)
+    ]
+    tree = BitmaskDecisionTree(JobRegistry(jobs))
+    for job in jobs:
+        tree.insert(job)
+
+    g = CSRWeightedGraph(
+        jobs, sections["indptr"], sections["neighbour_ids"], sections["weights"],
+        meta["weight_dtype"], meta["scale"], meta["offset"], meta.get("profile"),
+    )
+    return g, tree
+
+
+def _compute_or_load(
+    jobs: list[Job],
+    top_k: Optional[int],
+    cache_dir: Optional[str],
+    options: dict[str, Any],
+) -> dict[str, np.ndarray]:
+    """
+    Returns the similarity scores of <jobs>, which must be every job in <jobs.csv> in order.
+
+    If <top_k> is None, this is {"matrix": <the complete similarity matrix>}. Otherwise, this is
+    {"indices": ..., "scores": ...} as returned by src.similarity.top_k_neighbours. If a
+    distance tolerance is set, "pruned_pairs" also maps to the number of ordered pairs of
+    jobs pruned by the spatial index (see SpatialGrid.count_pruned_pairs), which is counted
+    from the grid rather than from far_mask, whose counts are lost in worker processes.
+
+    The scores are memory-mapped from <cache_dir> if they were cached for the current
+    <jobs.csv>, and computed (then cached, if <cache_dir> is not None) otherwise.
+
+    <options> maps "workers", "chunk_size", "distance_tolerance", "weight_profile",
+    "max_build_memory" and "file" to the build options of the same names described in
+    load_graph_and_tree.
+    """
+    workers, chunk_size = options["workers"], options["chunk_size"]
+    distance_tolerance = options["distance_tolerance"]
+    names = ["matrix"] if top_k is None else ["indices", "scores"]
+    prefix = "" if top_k is None else f"top{top_k}."
+    if distance_tolerance is not None:
+        prefix += f"tol{distance_tolerance}."
+    if options["weight_profile"] is not None:
+        prefix += f"profile{profile_tag(options['weight_profile'])}."
+    arrays = None if distance_tolerance is None else JobArrays(jobs)
+    pruned = {}
+    if arrays is not None:
+        arrays.build_spatial_index(distance_tolerance)
+        pruned["pruned_pairs"] = np.int64(arrays.spatial.count_pruned_pairs())
+    key = None
+    if cache_dir is not None:
+        key = cache_key(options["file"])
+        cached = {name: load_cached(key, prefix + name, cache_dir) for name in names}
+        if all(array is not None and len(array) == len(jobs) for array in cached.values()):
+            return {**cached, **pruned}
+
+    block_size = None if top_k is None else 1024
+    if options["max_build_memory"] is not None and jobs:
+        block_size = block_size_for_memory(len(jobs), top_k, options["max_build_memory"], workers)
+        chunk_size = min(chunk_size, block_size)
+
+    if arrays is None:
+        arrays = JobArrays(jobs)
+    arrays.profile = options["weight_profile"]
+    if top_k is None and workers is None:
+        computed = {"matrix": similarity_matrix(arrays, block_size)}
+    elif top_k is None:
+        computed = {"matrix": parallel_similarity_matrix(arrays, workers, chunk_size)}
+    else:
+        if workers is None:
+            indices, scores = top_k_neighbours(arrays, top_k, block_size)
+        else:
+            indices, scores = parallel_top_k_neighbours(arrays, top_k, workers, chunk_size, block_size)
+        computed = {"indices": indices, "scores": scores}
+
+    if key is not None:
+        save_cached(key, {prefix + name: array for name, array in computed.items()}, cache_dir)
+    return {**computed, **pruned}
 
 
 if __name__ == "__main__":
@@ -281,6 +1948,22 @@ if __name__ == "__main__":
     python_ta.check_all(
         config={
             "max-line-length": 120,
-            "extra-imports": ["typing", "random", "utility", "job"],
+            "extra-imports": [
+                "typing",
+                "random",
+                "heapq",
+                "itertools",
+                "collections",
+                "concurrent.futures",
+                "time",
+                "numpy",
+                "utility",
+                "similarity",
+                "cache",
+                "lsh",
+                "job",
+                "registry",
+                "snapshot",
+            ],
         }
     )
@@ -16,10 +16,14 @@ please contact us through Github using the "contact" button within our applicati
 This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
 """
 
-from typing import Optional, Any
+from typing import Any, Callable, Iterator, Optional
 from math import e, acos, sin, cos, pi
 import csv
 from src.job import Job
+from src.registry import JobRegistry
+
+# The weights of the distance, country, rating, skills and pay similarity components.
+SIMILARITY_WEIGHTS = [0.2, 0.3, 0.1, 0.3, 0.1]
 
 # ====================================================================================
 # Computation
@@ -78,10 +82,16 @@ def normalize_distance(job1: Job, job2: Job) -> float:
     or near 0 if the distance approaches 'larger' values.
 
     The function used is f(d) =  2/(1 + e^(2d)
+
+    The distance is computed as in calculate_distance, from the precomputed
+    features of <job1> and <job2>.
     """
-    coords1 = (job1.job_details["latitutde"], job1.job_details["longitude"])
-    coords2 = (job2.job_details["latitutde"], job2.job_details["longitude"])
-    distance = calculate_distance(coords1, coords2)
+    f1, f2 = job1.features, job2.features
+    cosine_angular_distance = (f1.sin_lat * f2.sin_lat) + (
+        f1.cos_lat * f2.cos_lat * cos(f2.lng - f1.lng)
+    )
+    clamped_value = max(min(cosine_angular_distance, 1), -1)
+    distance = acos(clamped_value) * 6371
     return sigmoid(x=(-2 * distance / 1000.0), scale_factor=2)
 
 
@@ -89,7 +99,7 @@ def normalize_country(job1: Job, job2: Job) -> float:
     """
     Returns a normalized similarity value for <job1> and <job2> based on whether they are the same.
     """
-    if job1.job_details["country"] == job2.job_details["country"]:
+    if job1.features.country_code == job2.features.country_code:
         return 0.8
     else:
         return 0
@@ -99,7 +109,7 @@ def normalize_rating(job1: Job, job2: Job) -> float:
     """
     Returns a normalized similarity value based on <job1> and <job2> ratings.
     """
-    rating1, rating2 = job1.job_details["rating"], job2.job_details["rating"]
+    rating1, rating2 = job1.rating, job2.rating
     return sigmoid(x=(-0.6 * abs(rating1 - rating2)), scale_factor=2)
 
 
@@ -107,10 +117,11 @@ def normalize_skills(job1: Job, job2: Job) -> float:
     """
     Returns a normalized similarity value based on the number of intersecting
     skills between <job1> and <job2>.
+
+    NOTE: The skills of a job are the characters of its skills string (see
+    JobFeatures.skills), not the names of its skills.
     """
-    skills1 = set(job1.job_details["skills"])
-    skills2 = set(job2.job_details["skills"])
-    num_intersecting = len(set.intersection(skills1, skills2))
+    num_intersecting = len(job1.features.skills & job2.features.skills)
     return sigmoid(num_intersecting - 2)
 
 
@@ -119,7 +130,7 @@ def normalize_pay(job1: Job, job2: Job) -> float:
     Returns a normalized similarity value based on <job1> and <job2> pay
     similarity.
     """
-    var = abs((job1.get_annual_pay() - job2.get_annual_pay())) / 1000.0
+    var = abs((job1.features.annual_pay - job2.features.annual_pay)) / 1000.0
     return sigmoid(x=(-0.75 * var), scale_factor=2)
 
 
@@ -128,7 +139,7 @@ def similarity_calculation(job1: Job, job2: Job) -> float:
     This function is used to calculate the similarity score between two jobs.
     The similarity score is calculated based on a number of metrics.
     """
-    weights = [0.2, 0.3, 0.1, 0.3, 0.1]
+    weights = SIMILARITY_WEIGHTS
     normalized_distance = normalize_distance(job1, job2) * weights[0]
     normalized_country = normalize_country(job1, job2) * weights[1]
     normalized_rating = normalize_rating(job1, job2) * weights[2]
@@ -151,17 +162,53 @@ def similarity_calculation(job1: Job, job2: Job) -> float:
 # ====================================================================================
 
 
-def load_jobs_csv() -> set[Job]:
+def load_jobs_csv(file: str = "data/jobs.csv") -> list[Job]:
+    """
+    Returns a list of Job instances representing every job in <file>, in the
+    order they appear in the file, with duplicates merged (see load_job_registry).
+
+    The jobs are not registered in any JobRegistry, so they may be added to one later,
+    e.g. as the new jobs of update_graph_and_tree.
+    """
+    jobs = {}
+    for job in _read_jobs(file, lambda job_id: job_id in jobs):
+        jobs[str(job)] = job
+    return list(jobs.values())
+
+
+def load_job_registry(file: str = "data/jobs.csv") -> JobRegistry:
     """
-    Returns a set of Job instances representing every job in <jobs.csv>.
+    Returns a JobRegistry of every job in <file>, registered in the order they appear
+    in the file.
 
-    Note that there are no duplicates in the CSV file!
+    Rows whose job id was already seen are merged into the first row with that job id,
+    so each job id appears once.
     """
-    jobs = set()
-    with open("data/jobs.csv", "r", newline="", encoding="utf-8") as csvfile:
+    registry = JobRegistry()
+
+    def is_duplicate(job_id: str) -> bool:
+        """Returns whether <job_id> is registered, counting it as a duplicate if so."""
+        if job_id in registry:
+            registry.duplicates += 1
+            return True
+        return False
+
+    for job in _read_jobs(file, is_duplicate):
+        registry.add(job)
+    return registry
+
+
+def _read_jobs(file: str, is_duplicate: Callable[[str], bool]) -> Iterator[Job]:
+    """
+    Yields a Job instance for every row of <file>, in order, skipping the rows which are
+    not valid and those whose job id <is_duplicate>, before their Job is constructed.
+    """
+    with open(file, "r", newline="", encoding="utf-8") as csvfile:
         job_reader = csv.reader(csvfile)
         next(job_reader)
         for row in job_reader:
+            if is_duplicate(row[12]):
+                continue
             try:
                 job_details = {
                     "job_title": row[0],
@@ -179,10 +226,10 @@ def load_jobs_csv() -> set[Job]:
                     "job_id": row[12],
                     "full_desc": row[13],
                 }
-                jobs.add(Job(job_details))
+                job = Job(job_details)
             except ValueError:
                 continue
-    return jobs
+            yield job
 
 
 # ====================================================================================
@@ -251,7 +298,7 @@ if __name__ == "__main__":
     python_ta.check_all(
         config={
             "max-line-length": 120,
-            "extra-imports": ["typing", "job", "math", "csv"],
+            "extra-imports": ["typing", "job", "registry", "math", "csv"],
             "disable": ["E9998"],
         }
     )
@@ -0,0 +1,34 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the tests of the job postings of our application.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from tests.test_structures import make_job
+
+
+def test_attributes_agree_with_decisions() -> None:
+    """
+    Test that a keyword found only inside an html tag of the fragmented description sets
+    both the decision and the attribute of the job.
+    """
+    job = make_job("1", fragmented_desc='<div class="remote">Onsite</div>', full_desc="Onsite only.")
+
+    assert job.decisions[1] == 1
+    assert job.get_attributes()["remote"] is True
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main(["test_job.py"])
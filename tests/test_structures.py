@@ -0,0 +1,111 @@
+"""
+CSC111 Winter 2024 Course Project 2: CareerCompass
+
+This Python module contains the tests of the incremental updates of our application's
+weighted graph and decision tree.
+
+Copyright and Usage Information
+===============================
+This file is provided solely for the personal and private use of the instructors
+and teaching assistants of CSC111 at the University of Toronto St. George campus.
+All forms of distribution of this code, whether as given or with any changes, are
+expressly prohibited. For more information on copyright of these files,
+please contact us through Github using the "contact" button within our application.
+
+This file is Copyright (c) 2024 Sherwin Okhowat, Kush Gandhi, David Cen, Tony Qi.
+"""
+
+from typing import Any
+from random import Random
+from src.job import Job
+from src.structures import BitmaskDecisionTree, WeightedGraph, update_graph_and_tree
+
+
+def make_job(job_id: str, **details: Any) -> Job:
+    """
+    Returns a Job with the job id <job_id>, whose other details default to those of a
+    remote Python job in Toronto unless given in <details>.
+    """
+    job_details = {
+        "job_title": "Software Developer",
+        "employer_name": "CareerCompass",
+        "rating": 4.0,
+        "link": "https://example.com/" + job_id,
+        "fragmented_desc": "<p>Remote Python role</p>",
+        "skills": "['Python', 'SQL']",
+        "latitutde": 43.65,
+        "longitude": -79.38,
+        "city": "Toronto",
+        "country": "Canada",
+        "pay_period": "ANNUAL",
+        "pay": 80000.0,
+        "job_id": job_id,
+        "full_desc": "A remote Python role.",
+    }
+    job_details.update(details)
+    return Job(job_details)
+
+
+def test_reposted_expired_job_replaces_old_job() -> None:
+    """
+    Test that a job posted again after it expired is stored with its new details, and
+    that the registry does not grow.
+    """
+    g, tree = WeightedGraph(), BitmaskDecisionTree()
+    update_graph_and_tree(g, tree, [make_job(str(i), pay=40000.0 + i) for i in range(5)], [])
+    tree.build_answer_table()
+
+    update_graph_and_tree(g, tree, [], [make_job("2")])
+    assert tree.registry.get("2") is None
+    update_graph_and_tree(g, tree, [make_job("2", pay=42.0)], [])
+
+    reposted = tree.registry.get("2")
+    assert reposted.pay == 42.0
+    assert reposted in g
+    assert len(tree.registry) == len(tree.registry.jobs) == 5
+    assert reposted in tree.answers.get_jobs([2] * 7)
+
+
+def test_reposted_job_with_new_details_replaces_old_job() -> None:
+    """
+    Test that a job posted again with different details, without expiring first,
+    replaces the job of the same job id.
+    """
+    g, tree = WeightedGraph(), BitmaskDecisionTree()
+    old = make_job("1")
+    update_graph_and_tree(g, tree, [make_job("0"), old], [])
+
+    update_graph_and_tree(g, tree, [make_job("1", pay=42.0)], [])
+
+    assert old not in g
+    assert tree.registry.get("1").pay == 42.0
+    assert tree.registry.get("1") in g
+    assert len(g) == len(tree.registry) == 2
+
+
+def test_sparse_updates_match_rebuild() -> None:
+    """
+    Test that removing and adding jobs in a sparse graph leaves every job with the same
+    top-k neighbours as building the graph from scratch.
+    """
+    rng = Random(111)
+    jobs = [
+        make_job(str(i), latitutde=rng.uniform(25, 60), longitude=rng.uniform(-125, -65),
+                 rating=rng.uniform(1, 5), pay=rng.uniform(40000, 160000),
+                 country=rng.choice(["Canada", "United States"]))
+        for i in range(450)
+    ]
+    g, tree = WeightedGraph(top_k=20), BitmaskDecisionTree()
+    update_graph_and_tree(g, tree, jobs[:400], [])
+    update_graph_and_tree(g, tree, jobs[400:], rng.sample(jobs[:400], 30))
+
+    rebuilt = WeightedGraph(top_k=20)
+    rebuilt.add_jobs(list(g.get_vertices()))
+    for job, v in g.get_vertices().items():
+        assert {u.item for u in v.neighbours} == {u.item for u in rebuilt.get_vertices()[job].neighbours}
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main(["test_structures.py"])